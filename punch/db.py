@@ -1,9 +1,9 @@
 from __future__ import annotations
 
-import json
 import aiosqlite
+import orjson
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, AsyncIterator
 
 
 # Column allowlists for safe dynamic updates
@@ -21,6 +21,40 @@ _ALLOWED_COLUMNS = {
 }
 
 
+# sqlite3 prepared-statement cache size (default 128)
+_STATEMENT_CACHE_SIZE = 256
+
+# Columns list_tasks may project, and the subset the task list views render
+_TASK_COLUMNS = {
+    "id", "agent_type", "prompt", "status", "priority", "result", "error", "session_id",
+    "working_dir", "source", "created_at", "started_at", "completed_at",
+}
+TASK_SUMMARY_COLUMNS = ("id", "agent_type", "prompt", "status", "source", "created_at")
+
+_CHAT_COLUMNS = {"id", "title", "session_id", "is_active", "created_at", "updated_at"}
+
+
+# project_tasks columns in table order, for rebuilding rows from joins
+_PROJECT_TASK_COLUMNS = (
+    "id", "project_id", "task_id", "title", "agent_type", "prompt", "position",
+    "depends_on", "status", "created_at",
+)
+
+
+def ready_project_tasks(tasks: list[dict]) -> list[dict]:
+    """The pending tasks in a project snapshot whose dependencies are all completed."""
+    completed_ids = {t["id"] for t in tasks if t["status"] == "completed"}
+    ready = []
+    for t in tasks:
+        if t["status"] != "pending":
+            continue
+        deps = t["depends_on"]
+        # Most tasks have none; skip the parse for the stored "[]"
+        if not deps or deps == "[]" or all(d in completed_ids for d in orjson.loads(deps)):
+            ready.append(t)
+    return ready
+
+
 def _validate_columns(table: str, kwargs: dict) -> None:
     allowed = _ALLOWED_COLUMNS.get(table, set())
     invalid = set(kwargs.keys()) - allowed
@@ -32,11 +66,28 @@ class Database:
     def __init__(self, db_path: str):
         self.db_path = db_path
         self._conn: aiosqlite.Connection | None = None
-
-    async def initialize(self):
-        self._conn = await aiosqlite.connect(self.db_path)
+        # Bumped on every write so callers can cheaply tell whether data changed
+        self.data_version = 0
+
+    async def initialize(self, fast_mode: bool = False):
+        """Open the connection and create the schema.
+
+        fast_mode drops durability (no fsync, journal kept in memory) and
+        takes an exclusive lock with no busy wait, for throwaway databases
+        owned by a single connection, such as the test suite's.
+        """
+        # sqlite3 caches prepared statements by SQL text; the default 128 slots
+        # can be outgrown by the app's distinct queries, evicting hot ones
+        self._conn = await aiosqlite.connect(self.db_path, cached_statements=_STATEMENT_CACHE_SIZE)
         self._conn.row_factory = aiosqlite.Row
-        await self._conn.execute("PRAGMA journal_mode=WAL")
+        if fast_mode:
+            await self._conn.execute("PRAGMA synchronous=OFF")
+            await self._conn.execute("PRAGMA journal_mode=MEMORY")
+            await self._conn.execute("PRAGMA temp_store=MEMORY")
+            await self._conn.execute("PRAGMA locking_mode=EXCLUSIVE")
+            await self._conn.execute("PRAGMA busy_timeout=0")
+        else:
+            await self._conn.execute("PRAGMA journal_mode=WAL")
         await self._conn.execute("PRAGMA foreign_keys=ON")
         await self._create_tables()
 
@@ -45,7 +96,10 @@ class Database:
             await self._conn.close()
 
     async def _create_tables(self):
+        # Whole schema in one transaction: a single commit instead of one per statement
         await self._conn.executescript("""
+            BEGIN;
+
             CREATE TABLE IF NOT EXISTS tasks (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 agent_type TEXT NOT NULL,
@@ -180,6 +234,8 @@ class Database:
             CREATE INDEX IF NOT EXISTS idx_memories_category ON memories(category);
             CREATE INDEX IF NOT EXISTS idx_memories_key ON memories(key);
             CREATE INDEX IF NOT EXISTS idx_webhooks_name ON webhooks(name);
+
+            COMMIT;
         """)
         await self._conn.commit()
 
@@ -198,6 +254,7 @@ class Database:
     async def execute(self, sql: str, params: tuple = ()) -> int:
         cursor = await self._conn.execute(sql, params)
         await self._conn.commit()
+        self.data_version += 1
         return cursor.lastrowid
 
     # --- Tasks ---
@@ -224,8 +281,17 @@ class Database:
         await self.execute(f"UPDATE tasks SET {sets} WHERE id = ?", tuple(vals))
 
     async def list_tasks(self, agent_type: str | None = None, status: str | None = None,
-                         limit: int = 50, offset: int = 0) -> list[dict]:
-        sql = "SELECT * FROM tasks WHERE 1=1"
+                         limit: int = 50, offset: int = 0,
+                         columns: tuple[str, ...] | None = None) -> list[dict]:
+        """List tasks newest first. `columns` limits the row to those fields (default all)."""
+        if columns is None:
+            select = "*"
+        else:
+            invalid = set(columns) - _TASK_COLUMNS
+            if invalid:
+                raise ValueError(f"Invalid columns for tasks: {invalid}")
+            select = ", ".join(columns)
+        sql = f"SELECT {select} FROM tasks WHERE 1=1"
         params: list = []
         if agent_type:
             sql += " AND agent_type = ?"
@@ -300,6 +366,19 @@ class Database:
             (task_id,),
         )
 
+    async def iter_conversation(self, task_id: int, batch_size: int = 100) -> AsyncIterator[dict]:
+        """Yield a task's conversation rows in batches instead of loading them all at once."""
+        cursor = await self._conn.execute(
+            "SELECT * FROM conversations WHERE task_id = ? ORDER BY created_at",
+            (task_id,),
+        )
+        try:
+            while rows := await cursor.fetchmany(batch_size):
+                for row in rows:
+                    yield dict(row)
+        finally:
+            await cursor.close()
+
     # --- Settings ---
 
     async def set_setting(self, key: str, value: str) -> None:
@@ -349,6 +428,24 @@ class Database:
     async def get_project(self, project_id: int) -> dict | None:
         return await self.fetch_one("SELECT * FROM projects WHERE id = ?", (project_id,))
 
+    async def get_project_with_tasks(self, project_id: int) -> tuple[dict | None, list[dict]]:
+        """Fetch a project and its tasks (ordered as list_project_tasks) in one query."""
+        pt_cols = ", ".join(f"pt.{c} AS pt_{c}" for c in _PROJECT_TASK_COLUMNS)
+        rows = await self.fetch_all(
+            f"SELECT p.*, {pt_cols} FROM projects p "
+            "LEFT JOIN project_tasks pt ON pt.project_id = p.id "
+            "WHERE p.id = ? ORDER BY pt.position, pt.id",
+            (project_id,),
+        )
+        if not rows:
+            return None, []
+        project = {k: v for k, v in rows[0].items() if not k.startswith("pt_")}
+        tasks = [
+            {c: r[f"pt_{c}"] for c in _PROJECT_TASK_COLUMNS}
+            for r in rows if r["pt_id"] is not None
+        ]
+        return project, tasks
+
     async def update_project(self, project_id: int, **kwargs) -> None:
         _validate_columns("projects", kwargs)
         kwargs["updated_at"] = datetime.now(timezone.utc).isoformat()
@@ -381,6 +478,19 @@ class Database:
             (project_id, title, agent_type, prompt, position, depends_on),
         )
 
+    async def bulk_create_project_tasks(self, project_id: int, rows: list[tuple]) -> None:
+        """Insert several project tasks in one transaction.
+
+        Each row is ``(title, agent_type, prompt, position, depends_on)``.
+        """
+        await self._conn.executemany(
+            "INSERT INTO project_tasks (project_id, title, agent_type, prompt, position, depends_on) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [(project_id, *row) for row in rows],
+        )
+        await self._conn.commit()
+        self.data_version += 1
+
     async def get_project_task(self, pt_id: int) -> dict | None:
         return await self.fetch_one("SELECT * FROM project_tasks WHERE id = ?", (pt_id,))
 
@@ -403,21 +513,37 @@ class Database:
             (project_id,),
         )
 
+    async def existing_project_task_ids(self, project_id: int, ids: list[int]) -> set[int]:
+        """Return which of `ids` are tasks in the given project."""
+        unique = set(ids)
+        if not unique:
+            return set()
+        placeholders = ",".join("?" * len(unique))
+        rows = await self.fetch_all(
+            f"SELECT id FROM project_tasks WHERE project_id = ? AND id IN ({placeholders})",
+            (project_id, *unique),
+        )
+        return {r["id"] for r in rows}
+
+    async def project_task_counts(self, project_ids: list[int]) -> dict[int, tuple[int, int]]:
+        """Map project id to (task_count, done_count) in one aggregate query."""
+        if not project_ids:
+            return {}
+        placeholders = ",".join("?" * len(project_ids))
+        rows = await self.fetch_all(
+            "SELECT project_id, COUNT(*) AS task_count, "
+            "SUM(CASE WHEN status IN ('completed', 'failed', 'skipped') THEN 1 ELSE 0 END) AS done_count "
+            f"FROM project_tasks WHERE project_id IN ({placeholders}) GROUP BY project_id",
+            tuple(project_ids),
+        )
+        return {r["project_id"]: (r["task_count"], r["done_count"]) for r in rows}
+
     async def delete_project_task(self, pt_id: int) -> None:
         await self.execute("DELETE FROM project_tasks WHERE id = ?", (pt_id,))
 
     async def get_ready_project_tasks(self, project_id: int) -> list[dict]:
         """Get pending project tasks whose dependencies are all completed."""
-        tasks = await self.list_project_tasks(project_id)
-        completed_ids = {t["id"] for t in tasks if t["status"] == "completed"}
-        ready = []
-        for t in tasks:
-            if t["status"] != "pending":
-                continue
-            deps = json.loads(t["depends_on"]) if t["depends_on"] else []
-            if all(d in completed_ids for d in deps):
-                ready.append(t)
-        return ready
+        return ready_project_tasks(await self.list_project_tasks(project_id))
 
     # --- Chats ---
 
@@ -429,6 +555,13 @@ class Database:
     async def get_chat(self, chat_id: int) -> dict | None:
         return await self.fetch_one("SELECT * FROM chats WHERE id = ?", (chat_id,))
 
+    async def get_chat_fields(self, chat_id: int, *fields: str) -> dict | None:
+        """Fetch only the named columns of a chat, in one query."""
+        invalid = set(fields) - _CHAT_COLUMNS
+        if invalid or not fields:
+            raise ValueError(f"Invalid columns for chats: {invalid or fields}")
+        return await self.fetch_one(f"SELECT {', '.join(fields)} FROM chats WHERE id = ?", (chat_id,))
+
     async def update_chat(self, chat_id: int, **kwargs) -> None:
         _validate_columns("chats", kwargs)
         kwargs["updated_at"] = datetime.now(timezone.utc).isoformat()
@@ -458,6 +591,18 @@ class Database:
             (chat_id, role, content, task_id, status),
         )
 
+    async def add_chat_messages_bulk(self, chat_id: int, rows: list[tuple]) -> None:
+        """Insert several messages in one transaction, in order.
+
+        Each row is ``(role, content)`` or ``(role, content, status)``.
+        """
+        await self._conn.executemany(
+            "INSERT INTO chat_messages (chat_id, role, content, status) VALUES (?, ?, ?, ?)",
+            [(chat_id, row[0], row[1], row[2] if len(row) > 2 else "complete") for row in rows],
+        )
+        await self._conn.commit()
+        self.data_version += 1
+
     async def get_chat_messages(self, chat_id: int) -> list[dict]:
         return await self.fetch_all(
             "SELECT * FROM chat_messages WHERE chat_id = ? ORDER BY created_at",
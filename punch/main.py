@@ -118,6 +118,7 @@ async def main():
     app = create_app(
         db=db, orchestrator=orchestrator, scheduler=scheduler,
         api_key=config.api_key, health_checker=health_checker,
+        max_workers=config.max_concurrent_tasks,
     )
 
     uvicorn_config = uvicorn.Config(
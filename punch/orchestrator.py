@@ -1,11 +1,12 @@
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
 from typing import Callable, Awaitable, List
 
-from punch.db import Database
+import orjson
+
+from punch.db import Database, ready_project_tasks
 from punch.runner import ClaudeRunner
 from punch.memory import Memory
 
@@ -15,6 +16,10 @@ logger = logging.getLogger("punch.orchestrator")
 NotifyCallback = Callable[[int, str, str], Awaitable[None]]  # task_id, status, message
 ApprovalCallback = Callable[[int, str, str], Awaitable[bool]]  # task_id, agent_type, prompt -> approved
 
+# Project task statuses that need no further work
+_TERMINAL_STATUSES = frozenset({"completed", "failed", "skipped"})
+
+
 class Orchestrator:
     def __init__(self, db: Database, runner: ClaudeRunner, memory: Memory | None = None):
         self.db = db
@@ -27,6 +32,7 @@ class Orchestrator:
         self._running_tasks: set[int] = set()  # track running task IDs
         self._project_locks: dict[int, asyncio.Lock] = {}
         self._chat_locks: dict[int, asyncio.Lock] = {}
+        self._pending: set[asyncio.Task] = set()  # fire-and-forget tasks still running
 
     def on_notify(self, callback: NotifyCallback):
         """Register a notification callback (for Telegram, web, etc.)."""
@@ -108,8 +114,8 @@ class Orchestrator:
         allowed_tools = None
         if agent and agent.get("allowed_tools"):
             try:
-                allowed_tools = json.loads(agent["allowed_tools"])
-            except (json.JSONDecodeError, TypeError):
+                allowed_tools = orjson.loads(agent["allowed_tools"])
+            except (orjson.JSONDecodeError, TypeError):
                 pass
 
         # Tool approval: if agent requires approval, ask before executing
@@ -214,6 +220,18 @@ class Orchestrator:
 
             return response
 
+    def _spawn(self, coro) -> asyncio.Task:
+        """Run a coroutine in the background, holding a reference until it finishes."""
+        task = asyncio.create_task(coro)
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+        return task
+
+    async def drain(self) -> None:
+        """Wait until every background task, including ones they spawn, has finished."""
+        while self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
     async def process_queue(self) -> None:
         """Process pending tasks from the queue."""
         if self._stopped:
@@ -225,7 +243,7 @@ class Orchestrator:
 
         for task in pending:
             # Fire and forget - concurrency is managed by the runner's semaphore
-            asyncio.create_task(self.execute_task(task["id"]))
+            self._spawn(self.execute_task(task["id"]))
 
     async def start_processing(self, interval: float = 5.0):
         """Start the background task processor loop."""
@@ -277,7 +295,7 @@ class Orchestrator:
         parts = [f"## Project: {project['name']}\n\n{brief}"]
 
         # Get results from completed dependencies
-        deps = json.loads(project_task["depends_on"]) if project_task["depends_on"] else []
+        deps = orjson.loads(project_task["depends_on"]) if project_task["depends_on"] else []
         if deps:
             parts.append("\n\n## Completed predecessor results:\n")
             parts.append("NOTE: The outputs below are from prior task steps. "
@@ -332,24 +350,31 @@ class Orchestrator:
             if not all_tasks:
                 return
 
+            # One pass over the tasks: count running and not-yet-done ones
+            running = pending = 0
+            for t in all_tasks:
+                if t["status"] == "running":
+                    running += 1
+                elif t["status"] not in _TERMINAL_STATUSES:
+                    pending += 1
+
             # Check if all tasks are done (completed, failed, or skipped)
-            terminal = {"completed", "failed", "skipped"}
-            if all(t["status"] in terminal for t in all_tasks):
+            if not running and not pending:
                 await self.db.update_project(project_id, status="completed")
                 logger.info(f"Project {project_id} completed")
                 return
 
             # Detect stuck projects (no ready tasks, but non-terminal tasks remain)
-            ready = await self.db.get_ready_project_tasks(project_id)
+            # Readiness comes from the snapshot above; no second read
+            ready = ready_project_tasks(all_tasks)
             if not ready:
-                pending = [t for t in all_tasks if t["status"] not in terminal and t["status"] != "running"]
-                if pending and not any(t["status"] == "running" for t in all_tasks):
-                    logger.warning(f"Project {project_id} is stuck: {len(pending)} tasks have unresolvable dependencies")
+                if pending and not running:
+                    logger.warning(f"Project {project_id} is stuck: {pending} tasks have unresolvable dependencies")
                 return
 
             # Fire newly-ready tasks
             for pt in ready:
-                asyncio.create_task(self.execute_project_task(pt["id"]))
+                self._spawn(self.execute_project_task(pt["id"]))
 
     async def start_project(self, project_id: int) -> None:
         """Set project to active and fire root tasks (those with no dependencies)."""
@@ -2,9 +2,10 @@ from __future__ import annotations
 
 import asyncio
 import logging
-import json
 from dataclasses import dataclass
 
+import orjson
+
 logger = logging.getLogger("punch.runner")
 
 
@@ -99,10 +100,10 @@ class ClaudeRunner:
                 new_session_id = None
                 if output_format == "json":
                     try:
-                        data = json.loads(stdout)
+                        data = orjson.loads(stdout)
                         new_session_id = data.get("session_id")
                         stdout = data.get("result", stdout)
-                    except json.JSONDecodeError:
+                    except orjson.JSONDecodeError:
                         pass
 
                 result = RunResult(
@@ -32,6 +32,8 @@ _INJECTION_PATTERNS = [
     re.compile(r"(?:execute|run|call)\s+(?:the\s+)?(?:following\s+)?(?:command|shell|bash|tool)", re.IGNORECASE),
 ]
 
+_EXCESS_NEWLINES = re.compile(r"\n{4,}")
+
 
 def sanitize_content(text: str, max_length: int = MAX_CONTENT_LENGTH) -> str:
     """Sanitize external content for safe inclusion in prompts.
@@ -50,13 +52,14 @@ def sanitize_content(text: str, max_length: int = MAX_CONTENT_LENGTH) -> str:
         logger.info(f"Truncated content from {len(text)} to {max_length} chars")
 
     # Flag injection patterns (replace with marker, don't silently remove)
+    # subn finds and replaces in one pass instead of search() then sub()
     for pattern in _INJECTION_PATTERNS:
-        if pattern.search(text):
+        text, count = pattern.subn("[SANITIZED]", text)
+        if count:
             logger.warning(f"Potential injection pattern detected: {pattern.pattern[:60]}")
-            text = pattern.sub("[SANITIZED]", text)
 
     # Collapse excessive whitespace (>3 consecutive newlines)
-    text = re.sub(r"\n{4,}", "\n\n\n", text)
+    text = _EXCESS_NEWLINES.sub("\n\n\n", text)
 
     return text
 
@@ -252,7 +252,6 @@ class PunchTelegramBot:
         await update.message.reply_text(f"Task #{task_id} created ({agent_type} agent).\nProcessing...")
 
         if self.execute_fn:
-            import asyncio
             asyncio.create_task(self._execute_and_reply(task_id, update))
 
     async def _execute_and_reply(self, task_id: int, update: Update):
@@ -1,17 +1,32 @@
 from __future__ import annotations
 
 import asyncio
-import json
+import functools
+import hmac
 import logging
+import os
+import re
+import secrets
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Optional
+from typing import Any, Awaitable, Callable, Optional
+from urllib.parse import parse_qsl, urlparse
 
+import anyio
 from fastapi import FastAPI, Request, Form, Query
-from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
+from fastapi.responses import (
+    FileResponse, HTMLResponse, JSONResponse, RedirectResponse, Response, StreamingResponse,
+)
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+from pydantic import BaseModel, Field, StrictInt, ValidationError
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import orjson
 
-from punch.db import Database
+from punch.db import TASK_SUMMARY_COLUMNS, Database
 
 logger = logging.getLogger("punch.web")
 
@@ -71,59 +86,479 @@ SETTINGS_SCHEMA = [
 ]
 
 
-def create_app(db: Database, orchestrator=None, scheduler=None, api_key: str | None = None,
-               health_checker=None) -> FastAPI:
-    app = FastAPI(title="Punch", docs_url="/api/docs")
-    templates = Jinja2Templates(directory=str(TEMPLATE_DIR))
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson.
 
-    # Store references for route handlers
-    app.state.db = db
-    app.state.orchestrator = orchestrator
-    app.state.scheduler = scheduler
-    app.state.health_checker = health_checker
+    Same as ``fastapi.responses.ORJSONResponse``, which newer FastAPI releases
+    deprecate in favour of response models.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
+
+
+# Largest JSON body accepted by the API, checked before parsing
+_MAX_BODY_SIZE = 1_000_000
+
+
+class _BodyError(Exception):
+    """A JSON request body that can't be used; answered as {"error": message}."""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+
+
+class _InvalidJSON(_BodyError):
+    def __init__(self):
+        super().__init__(400, "Invalid JSON")
+
+
+async def _json_body(request: Request, limit: int = _MAX_BODY_SIZE) -> Any:
+    """Parse the request body as JSON with orjson, rejecting oversized bodies.
+
+    Content-Length is checked up front; the body is then streamed with the
+    same cap so chunked uploads can't get around it. Raises _BodyError, which
+    the app turns into the API's usual {"error": ...} response.
+    """
+    try:
+        declared = int(request.headers.get("content-length", "0"))
+    except ValueError:
+        raise _BodyError(400, "Invalid Content-Length")
+    if declared > limit:
+        raise _BodyError(413, "Request body too large")
+    chunks = bytearray()
+    async for chunk in request.stream():
+        chunks += chunk
+        if len(chunks) > limit:
+            raise _BodyError(413, "Request body too large")
+    try:
+        return orjson.loads(chunks)
+    except orjson.JSONDecodeError:
+        raise _InvalidJSON() from None
+
+
+# Added to every response, pre-encoded for the raw ASGI send
+_SECURITY_HEADERS = (
+    (b"x-content-type-options", b"nosniff"),
+    (b"x-frame-options", b"DENY"),
+)
+
+# Static files up to this size are kept in memory, up to this many of them
+_STATIC_CACHE_MAX_BYTES = 1024 * 1024
+_STATIC_CACHE_FILES = 128
+
+# --- Request bodies ---
+
+_MAX_BRIEF_SIZE = 50_000
+_MAX_PROMPT_SIZE = 20_000
+_MAX_DEPENDS_ON = 256
+
+
+class TaskSpec(BaseModel):
+    """A task given inline when creating a project."""
+
+    title: Optional[str] = None
+    agent_type: str = "general"
+    prompt: str = Field("", max_length=_MAX_PROMPT_SIZE)
+    position: Optional[int] = None
+    # StrictInt so JSON true/false aren't taken as 1/0
+    depends_on: list[StrictInt] = Field(default_factory=list, max_length=_MAX_DEPENDS_ON)
+
+
+class ProjectCreate(BaseModel):
+    name: str = Field(min_length=1)
+    brief: str = Field("", max_length=_MAX_BRIEF_SIZE)
+    tasks: list[TaskSpec] = Field(default_factory=list)
+
+
+class ProjectTaskCreate(BaseModel):
+    title: str = Field(min_length=1)
+    agent_type: str = "general"
+    prompt: str = Field("", max_length=_MAX_PROMPT_SIZE)
+    position: int = 0
+    depends_on: list[StrictInt] = Field(default_factory=list, max_length=_MAX_DEPENDS_ON)
+
+
+class ProjectTaskUpdate(BaseModel):
+    """Fields a project task update may change; only the ones sent are applied."""
+
+    title: Optional[str] = None
+    agent_type: Optional[str] = None
+    prompt: Optional[str] = Field(None, max_length=_MAX_PROMPT_SIZE)
+    position: Optional[int] = None
+    depends_on: Optional[list[StrictInt]] = Field(None, max_length=_MAX_DEPENDS_ON)
+    status: Optional[str] = None
+
+
+def _dump_depends_on(deps: list[int]) -> str:
+    # Most tasks have no dependencies; skip the encoder for those
+    return orjson.dumps(deps).decode() if deps else "[]"
+
+
+def _validation_error(e: ValidationError) -> ORJSONResponse:
+    """Turn the first pydantic error into the API's usual 400 {"error": ...} shape."""
+    err = e.errors(include_url=False)[0]
+    loc = ".".join(str(part) for part in err["loc"])
+    message = f"{loc}: {err['msg']}" if loc else err["msg"]
+    return ORJSONResponse({"error": message}, status_code=400)
+
+
+# Asset names carrying a content hash, e.g. app.3f9a1c2b.css
+_FINGERPRINTED = re.compile(r"\.[0-9a-f]{8,}\.[A-Za-z0-9]+$")
+
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles with Cache-Control on every file and an in-memory LRU.
+
+    Fingerprinted assets never change under the same name, so browsers may
+    keep them for a year. Anything else (e.g. browser screenshots) gets a
+    short max-age and then revalidates against the ETag FileResponse sets.
+
+    Small files are served from memory: one entry per path, replaced when
+    the file's mtime or size changes. Misses are read in a worker thread,
+    like FileResponse does. Large files and range requests stream from disk
+    as usual.
+    """
+
+    def __init__(self, *args, max_cached_files: int = _STATIC_CACHE_FILES, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._max_cached_files = max_cached_files
+        # path -> (mtime_ns, size, body)
+        self._memory: OrderedDict[str, tuple[int, int, bytes]] = OrderedDict()
+
+    async def _read_cached(self, full_path, stat_result: os.stat_result) -> bytes:
+        key = str(full_path)
+        entry = self._memory.get(key)
+        if entry is not None and entry[:2] == (stat_result.st_mtime_ns, stat_result.st_size):
+            self._memory.move_to_end(key)
+            return entry[2]
+        body = await anyio.to_thread.run_sync(Path(full_path).read_bytes)
+        self._memory[key] = (stat_result.st_mtime_ns, stat_result.st_size, body)
+        self._memory.move_to_end(key)
+        if len(self._memory) > self._max_cached_files:
+            self._memory.popitem(last=False)
+        return body
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        response = await super().get_response(path, scope)
+        stat_result = getattr(response, "stat_result", None)
+        if (
+            isinstance(response, FileResponse)
+            and stat_result is not None
+            and scope["method"] == "GET"
+            and stat_result.st_size <= _STATIC_CACHE_MAX_BYTES
+            and not any(k == b"range" for k, _ in scope["headers"])
+        ):
+            body = await self._read_cached(response.path, stat_result)
+            # Let Response size the body it actually got
+            headers = {k: v for k, v in response.headers.items() if k != "content-length"}
+            response = Response(body, status_code=response.status_code, headers=headers)
+        return response
+
+    def file_response(self, full_path, stat_result, scope: Scope, status_code: int = 200) -> Response:
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        if _FINGERPRINTED.search(str(full_path)):
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        else:
+            response.headers["Cache-Control"] = "public, max-age=300, must-revalidate"
+        return response
+
+
+# Paths that skip onboarding redirect
+_SKIP_ONBOARDING = ("/static", "/api/", "/onboarding", "/htmx/onboarding")
+
+
+def _query_api_key(scope: Scope) -> bytes | None:
+    query = scope["query_string"]
+    if b"api_key=" not in query:
+        return None
+    value = dict(parse_qsl(query.decode("latin-1"))).get("api_key")
+    return value.encode() if value else None
+
+
+def _cookie_api_key(cookie: bytes | None) -> bytes | None:
+    if not cookie or b"punch_api_key=" not in cookie:
+        return None
+    for part in cookie.split(b";"):
+        name, _, value = part.strip().partition(b"=")
+        if name == b"punch_api_key":
+            return value
+    return None
+
+
+class AuthMiddleware:
+    """API key authentication.
+
+    Only installed when an API key is configured, so localhost-only mode pays
+    nothing for it. Written as a plain ASGI middleware rather than
+    ``@app.middleware("http")`` so requests aren't re-dispatched through
+    BaseHTTPMiddleware's extra task and streaming queues.
+    """
+
+    def __init__(self, app: ASGIApp, api_key: str):
+        self.app = app
+        # Encoded once so each request only pays for the constant-time compare
+        self.api_key = api_key.encode()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope.get("raw_path", b"").startswith(b"/static"):
+            await self.app(scope, receive, send)
+            return
+
+        # Pull the headers we need straight from the raw (lowercased) list
+        # instead of building Request/Headers objects on every request.
+        key_header = cookie = None
+        for name, value in scope["headers"]:
+            if name == b"x-api-key":
+                key_header = key_header or value
+            elif name == b"cookie":
+                cookie = cookie or value
+
+        provided = key_header or _query_api_key(scope) or _cookie_api_key(cookie)
+        if not (provided and hmac.compare_digest(provided, self.api_key)):
+            response = ORJSONResponse({"error": "Unauthorized"}, status_code=401)
+            await response(scope, receive, send)
+            return
 
-    # Paths that skip onboarding redirect
-    _SKIP_ONBOARDING = ("/static", "/api/", "/onboarding", "/htmx/onboarding")
-
-    # API key authentication + CSRF + onboarding middleware
-    @app.middleware("http")
-    async def auth_middleware(request: Request, call_next):
-        path = request.url.path
-
-        # Skip auth if no API key configured (localhost-only mode)
-        if api_key:
-            if not path.startswith("/static"):
-                provided = (
-                    request.headers.get("X-API-Key")
-                    or request.query_params.get("api_key")
-                    or request.cookies.get("punch_api_key")
-                )
-                if provided != api_key:
-                    return JSONResponse({"error": "Unauthorized"}, status_code=401)
+        await self.app(scope, receive, send)
+
+
+class GuardMiddleware:
+    """CSRF protection and onboarding redirect."""
+
+    def __init__(self, app: ASGIApp, db: Database):
+        self.app = app
+        self.db = db
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
 
         # CSRF protection: reject mutating requests from foreign origins
-        if request.method in ("POST", "PUT", "DELETE", "PATCH"):
-            origin = request.headers.get("origin")
+        if scope["method"] in ("POST", "PUT", "DELETE", "PATCH"):
+            origin = host = None
+            for name, value in scope["headers"]:
+                if name == b"origin":
+                    origin = origin or value
+                elif name == b"host":
+                    host = host or value
             if origin:
-                from urllib.parse import urlparse
-                parsed = urlparse(origin)
-                expected_host = request.headers.get("host", "").split(":")[0]
+                parsed = urlparse(origin.decode("latin-1"))
+                expected_host = (host or b"").decode("latin-1").split(":")[0]
                 if parsed.hostname not in (expected_host, "localhost", "127.0.0.1"):
-                    return JSONResponse({"error": "CSRF rejected"}, status_code=403)
+                    response = ORJSONResponse({"error": "CSRF rejected"}, status_code=403)
+                    await response(scope, receive, send)
+                    return
 
         # Onboarding redirect: if onboarding_complete not set, redirect HTML pages
         if not any(path.startswith(p) for p in _SKIP_ONBOARDING):
-            onboarding_done = await db.get_setting("onboarding_complete")
+            onboarding_done = await self.db.get_setting("onboarding_complete")
             if not onboarding_done and path != "/onboarding":
-                return RedirectResponse("/onboarding", status_code=302)
+                response = RedirectResponse("/onboarding", status_code=302)
+                await response(scope, receive, send)
+                return
 
-        response = await call_next(request)
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        return response
+        await self.app(scope, receive, send)
+
+
+class SecurityHeadersMiddleware:
+    """Append the pre-encoded security headers to every HTTP response."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_security_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), *_SECURITY_HEADERS]
+            await send(message)
+
+        await self.app(scope, receive, send_with_security_headers)
+
+
+# Chat replies waiting for a worker before new ones are turned away
+_CHAT_QUEUE_SIZE = 100
+
+# Tasks per page on the task list; further pages load as the list scrolls
+_TASK_PAGE_SIZE = 50
+
+# Seconds a rendered page is reused while the db is unchanged
+_HTML_CACHE_TTL = 3.0
+
+
+@functools.cache
+def _page_templates() -> dict:
+    """Every template the app renders, compiled once per process.
+
+    Templates don't depend on create_app's arguments, so apps built later
+    (tests, reloads) share one environment instead of recompiling.
+    """
+    # Templates ship with the package, so skip mtime checks, never evict, and
+    # keep compiled bytecode on disk for the next boot
+    env = Environment(
+        loader=FileSystemLoader(str(TEMPLATE_DIR)), autoescape=True,
+        auto_reload=False, cache_size=-1, bytecode_cache=FileSystemBytecodeCache(),
+    )
+    templates = Jinja2Templates(env=env)
+    # Compile everything up front, including base.html and anything only
+    # reached through extends/include, so no request pays for a first parse
+    for name in env.list_templates():
+        env.get_template(name)
+    # Templates are resolved once and rendered straight into an HTMLResponse,
+    # skipping TemplateResponse's per-call lookup and context processing
+    return {
+        name: templates.get_template(name) for name in (
+            "home.html", "tasks.html", "task_detail.html", "agents.html", "cron.html",
+            "browser.html", "settings.html", "projects.html", "project_detail.html",
+            "logs.html", "chat.html", "onboarding.html",
+            "partials/chat_messages.html", "partials/task_list.html",
+            "partials/project_task_list.html", "partials/onboarding_claude_check.html",
+            "partials/onboarding_telegram_saved.html", "partials/settings_saved.html",
+        )
+    }
+
+
+def create_app(db: Database, orchestrator=None, scheduler=None, api_key: str | None = None,
+               health_checker=None, max_workers: int = 4) -> FastAPI:
+    # Chat replies are handed to a fixed pool of workers through a bounded
+    # queue rather than one task per request. Task runs don't go through it:
+    # the runner's semaphore already caps them, and a queued task would still
+    # be 'pending' and get picked up a second time by process_queue.
+    chat_queue: asyncio.Queue = asyncio.Queue(maxsize=_CHAT_QUEUE_SIZE)
+    workers: list[asyncio.Task] = []
+
+    async def _worker():
+        while True:
+            fn, args = await chat_queue.get()
+            try:
+                await fn(*args)
+            except Exception as e:
+                logger.error(f"Background job error: {e}")
+            finally:
+                chat_queue.task_done()
+
+    def _enqueue(fn: Callable[..., Awaitable[Any]], *args) -> bool:
+        """Queue a background job, starting the workers on first use. Returns False if the queue is full."""
+        if not workers:
+            workers.extend(asyncio.create_task(_worker()) for _ in range(max_workers))
+        try:
+            chat_queue.put_nowait((fn, args))
+        except asyncio.QueueFull:
+            logger.warning("Chat queue full, dropping job")
+            return False
+        return True
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        yield
+        for w in workers:
+            w.cancel()
+
+    app = FastAPI(title="Punch", docs_url="/api/docs", default_response_class=ORJSONResponse,
+                  lifespan=lifespan)
+    page_templates = _page_templates()
+
+    @app.exception_handler(_BodyError)
+    async def body_error(request: Request, exc: _BodyError) -> ORJSONResponse:
+        return ORJSONResponse({"error": exc.message}, status_code=exc.status_code)
+
+    def render(name: str, request: Request, headers: dict[str, str] | None = None, **context) -> HTMLResponse:
+        return HTMLResponse(page_templates[name].render(request=request, **context), headers=headers)
+
+    # Store references for route handlers
+    app.state.db = db
+    app.state.orchestrator = orchestrator
+    app.state.scheduler = scheduler
+    app.state.health_checker = health_checker
+    app.state.chat_queue = chat_queue
+
+    # Agents are read on nearly every page and chat message but only written
+    # through the agent API, which reloads this list after each write. Loaded
+    # on first use since the test transport doesn't run lifespan.
+    app.state.agents = None
+
+    async def refresh_agents() -> list[dict]:
+        app.state.agents = await db.list_agents()
+        return app.state.agents
+
+    async def cached_list_agents() -> list[dict]:
+        if app.state.agents is None:
+            return await refresh_agents()
+        return app.state.agents
+
+    async def cached_get_agent(name: str) -> dict | None:
+        return next((a for a in await cached_list_agents() if a["name"] == name), None)
+
+    # CSRF + onboarding middleware, wrapped by API key auth when a key is set
+    # (no key means localhost-only mode). Security headers go outermost so
+    # they're on the 401/403/redirect responses too.
+    app.add_middleware(GuardMiddleware, db=db)
+    if api_key:
+        app.add_middleware(AuthMiddleware, api_key=api_key)
+    app.add_middleware(SecurityHeadersMiddleware)
+
+    # Conditional GETs for polled endpoints: the ETag tracks the db write
+    # counter, so any write invalidates it. The nonce keeps tags from one
+    # process from matching after a restart.
+    etag_nonce = secrets.token_hex(4)
+
+    def _cache_headers() -> dict[str, str]:
+        return {"ETag": f'W/"{etag_nonce}-{db.data_version}"', "Cache-Control": "no-cache"}
+
+    def _not_modified(request: Request, headers: dict[str, str]) -> Response | None:
+        if request.headers.get("if-none-match") == headers["ETag"]:
+            return Response(status_code=304, headers=headers)
+        return None
+
+    # Rendered read-mostly pages, keyed on path, query and the db write counter
+    # so any write misses the cache. Concurrent misses for the same key share
+    # one render.
+    html_cache: dict[tuple, tuple[float, bytes]] = {}
+    html_pending: dict[tuple, asyncio.Future] = {}
+
+    def cached_html(handler: Callable[..., Awaitable[Response]]):
+        @functools.wraps(handler)
+        async def wrapper(**kwargs):
+            request: Request = kwargs["request"]
+            key = (request.url.path, tuple(sorted(request.query_params.multi_items())), db.data_version)
+            now = time.monotonic()
+            entry = html_cache.get(key)
+            if entry and entry[0] > now:
+                return HTMLResponse(entry[1])
+            pending = html_pending.get(key)
+            if pending is not None:
+                body = await asyncio.shield(pending)
+                if body is not None:
+                    return HTMLResponse(body)
+                return await handler(**kwargs)
+
+            pending = html_pending[key] = asyncio.get_running_loop().create_future()
+            body = None
+            try:
+                response = await handler(**kwargs)
+                if response.status_code == 200 and isinstance(response, HTMLResponse):
+                    body = response.body
+                    for k in [k for k, (expires, _) in html_cache.items() if expires <= now]:
+                        del html_cache[k]
+                    html_cache[key] = (now + _HTML_CACHE_TTL, body)
+                return response
+            finally:
+                del html_pending[key]
+                pending.set_result(body)
+
+        return wrapper
 
     if STATIC_DIR.exists():
-        app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
+        app.mount("/static", CachedStaticFiles(directory=str(STATIC_DIR)), name="static")
 
     # --- HTML Pages ---
 
@@ -135,88 +570,77 @@ def create_app(db: Database, orchestrator=None, scheduler=None, api_key: str | N
         return RedirectResponse("/chat", status_code=302)
 
     @app.get("/dashboard", response_class=HTMLResponse)
+    @cached_html
     async def dashboard(request: Request):
-        recent_tasks = await db.list_tasks(limit=20)
-        return templates.TemplateResponse("home.html", {
-            "request": request, "tasks": recent_tasks, "page": "dashboard",
-        })
+        recent_tasks = await db.list_tasks(limit=20, columns=TASK_SUMMARY_COLUMNS)
+        return render("home.html", request, tasks=recent_tasks, page="dashboard")
 
     @app.get("/tasks", response_class=HTMLResponse)
+    @cached_html
     async def tasks_page(request: Request, status: str = None, agent_type: str = None):
-        tasks = await db.list_tasks(status=status, agent_type=agent_type, limit=100)
-        agents = await db.list_agents()
-        return templates.TemplateResponse("tasks.html", {
-            "request": request, "tasks": tasks, "agents": agents,
-            "page": "tasks", "filter_status": status, "filter_agent": agent_type,
-        })
+        tasks, agents = await asyncio.gather(
+            db.list_tasks(status=status, agent_type=agent_type, limit=_TASK_PAGE_SIZE,
+                          columns=TASK_SUMMARY_COLUMNS),
+            cached_list_agents(),
+        )
+        return render("tasks.html", request, tasks=tasks, agents=agents, page="tasks",
+                      filter_status=status, filter_agent=agent_type,
+                      next_offset=_TASK_PAGE_SIZE if len(tasks) == _TASK_PAGE_SIZE else None)
 
     @app.get("/tasks/{task_id}", response_class=HTMLResponse)
     async def task_detail(request: Request, task_id: int):
-        task = await db.get_task(task_id)
-        conversation = await db.get_conversation(task_id) if task else []
-        return templates.TemplateResponse("task_detail.html", {
-            "request": request, "task": task, "conversation": conversation, "page": "tasks",
-        })
+        # A missing task has no conversation rows, so both can be fetched at once
+        task, conversation = await asyncio.gather(db.get_task(task_id), db.get_conversation(task_id))
+        return render("task_detail.html", request, task=task, conversation=conversation, page="tasks")
 
     @app.get("/agents", response_class=HTMLResponse)
+    @cached_html
     async def agents_page(request: Request):
-        agents = await db.list_agents()
-        return templates.TemplateResponse("agents.html", {
-            "request": request, "agents": agents, "page": "agents",
-        })
+        agents = await cached_list_agents()
+        return render("agents.html", request, agents=agents, page="agents")
 
     @app.get("/cron", response_class=HTMLResponse)
+    @cached_html
     async def cron_page(request: Request):
-        jobs = await db.list_cron_jobs()
-        agents = await db.list_agents()
-        return templates.TemplateResponse("cron.html", {
-            "request": request, "jobs": jobs, "agents": agents, "page": "cron",
-        })
+        jobs, agents = await asyncio.gather(db.list_cron_jobs(), cached_list_agents())
+        return render("cron.html", request, jobs=jobs, agents=agents, page="cron")
 
     @app.get("/browser", response_class=HTMLResponse)
+    @cached_html
     async def browser_page(request: Request):
         sessions = await db.list_browser_sessions()
-        return templates.TemplateResponse("browser.html", {
-            "request": request, "sessions": sessions, "page": "browser",
-        })
+        return render("browser.html", request, sessions=sessions, page="browser")
 
     @app.get("/settings", response_class=HTMLResponse)
+    @cached_html
     async def settings_page(request: Request):
         settings_list = await db.list_settings()
         settings_map = {s["key"]: s["value"] for s in settings_list}
-        return templates.TemplateResponse("settings.html", {
-            "request": request, "settings": settings_map,
-            "schema": SETTINGS_SCHEMA, "page": "settings",
-        })
+        return render("settings.html", request, settings=settings_map,
+                      schema=SETTINGS_SCHEMA, page="settings")
 
     @app.get("/projects", response_class=HTMLResponse)
+    @cached_html
     async def projects_page(request: Request, status: str = None):
         projects = await db.list_projects(status=status)
+        counts = await db.project_task_counts([p["id"] for p in projects])
         for p in projects:
-            pts = await db.list_project_tasks(p["id"])
-            p["task_count"] = len(pts)
-            p["done_count"] = sum(1 for t in pts if t["status"] in ("completed", "failed", "skipped"))
-        return templates.TemplateResponse("projects.html", {
-            "request": request, "projects": projects, "page": "projects",
-            "filter_status": status,
-        })
+            p["task_count"], p["done_count"] = counts.get(p["id"], (0, 0))
+        return render("projects.html", request, projects=projects, page="projects", filter_status=status)
 
     @app.get("/projects/{project_id}", response_class=HTMLResponse)
     async def project_detail_page(request: Request, project_id: int):
-        project = await db.get_project(project_id)
-        project_tasks = await db.list_project_tasks(project_id) if project else []
-        agents = await db.list_agents()
-        return templates.TemplateResponse("project_detail.html", {
-            "request": request, "project": project, "project_tasks": project_tasks,
-            "agents": agents, "page": "projects",
-        })
+        (project, project_tasks), agents = await asyncio.gather(
+            db.get_project_with_tasks(project_id), cached_list_agents(),
+        )
+        return render("project_detail.html", request, project=project, project_tasks=project_tasks,
+                      agents=agents, page="projects")
 
     @app.get("/logs", response_class=HTMLResponse)
+    @cached_html
     async def logs_page(request: Request):
-        tasks = await db.list_tasks(limit=50)
-        return templates.TemplateResponse("logs.html", {
-            "request": request, "tasks": tasks, "page": "logs",
-        })
+        tasks = await db.list_tasks(limit=50, columns=TASK_SUMMARY_COLUMNS)
+        return render("logs.html", request, tasks=tasks, page="logs")
 
     # --- Chat Pages ---
 
@@ -234,12 +658,8 @@ def create_app(db: Database, orchestrator=None, scheduler=None, api_key: str | N
         chat = await db.get_chat(chat_id)
         if not chat or not chat["is_active"]:
             return RedirectResponse("/chat", status_code=302)
-        messages = await db.get_chat_messages(chat_id)
-        chats = await db.list_chats(limit=50)
-        return templates.TemplateResponse("chat.html", {
-            "request": request, "chat": chat, "messages": messages,
-            "chats": chats, "page": "chat",
-        })
+        messages, chats = await asyncio.gather(db.get_chat_messages(chat_id), db.list_chats(limit=50))
+        return render("chat.html", request, chat=chat, messages=messages, chats=chats, page="chat")
 
     # --- Chat HTMX ---
 
@@ -247,22 +667,32 @@ def create_app(db: Database, orchestrator=None, scheduler=None, api_key: str | N
     async def htmx_chat_send(request: Request, chat_id: int, message: str = Form(...)):
         if orchestrator:
             # Store user message and create pending assistant placeholder
-            await db.add_chat_message(chat_id, role="user", content=message)
-            await db.add_chat_message(chat_id, role="assistant", content="", status="pending")
-            # Process in background (orchestrator.chat handles Claude + session)
-            asyncio.create_task(_process_chat(chat_id, message))
+            await db.add_chat_messages_bulk(
+                chat_id, [("user", message), ("assistant", "", "pending")]
+            )
+            # Process in background (orchestrator.chat handles Claude + session).
+            # The queue can fill during the insert above, so check only now.
+            if not _enqueue(_process_chat, chat_id, message):
+                await _finish_pending_reply(chat_id, "Error: Punch is busy, try again shortly.", status="failed")
+                return HTMLResponse("Punch is busy, try again shortly.", status_code=503)
         messages = await db.get_chat_messages(chat_id)
-        return templates.TemplateResponse("partials/chat_messages.html", {
-            "request": request, "messages": messages, "chat_id": chat_id,
-        })
+        return render("partials/chat_messages.html", request, messages=messages, chat_id=chat_id)
+
+    async def _finish_pending_reply(chat_id: int, content: str, status: str = "complete"):
+        """Fill in the chat's latest pending assistant placeholder."""
+        msgs = await db.get_chat_messages(chat_id)
+        for msg in reversed(msgs):
+            if msg["role"] == "assistant" and msg["status"] == "pending":
+                await db.update_chat_message(msg["id"], content=content, status=status)
+                break
 
     async def _process_chat(chat_id: int, message: str):
         """Background task: run Claude and update the pending assistant message."""
         try:
-            chat = await db.get_chat(chat_id)
+            chat = await db.get_chat_fields(chat_id, "session_id", "title")
             if not chat:
                 return
-            agent = await db.get_agent("general")
+            agent = await cached_get_agent("general")
             system_prompt = agent["system_prompt"] if agent else None
 
             result = await orchestrator.runner.run(
@@ -278,11 +708,7 @@ def create_app(db: Database, orchestrator=None, scheduler=None, api_key: str | N
             response = result.stdout if result.success else f"Error: {result.stderr}"
 
             # Update the pending message with the actual response
-            msgs = await db.get_chat_messages(chat_id)
-            for msg in reversed(msgs):
-                if msg["role"] == "assistant" and msg["status"] == "pending":
-                    await db.update_chat_message(msg["id"], content=response, status="complete")
-                    break
+            await _finish_pending_reply(chat_id, response)
 
             await db.update_chat(chat_id)
 
@@ -294,50 +720,48 @@ def create_app(db: Database, orchestrator=None, scheduler=None, api_key: str | N
                 await db.update_chat(chat_id, title=title)
         except Exception as e:
             logger.error(f"Chat processing error for chat {chat_id}: {e}")
-            msgs = await db.get_chat_messages(chat_id)
-            for msg in reversed(msgs):
-                if msg["role"] == "assistant" and msg["status"] == "pending":
-                    await db.update_chat_message(msg["id"], content=f"Error: {str(e)}", status="complete")
-                    break
+            await _finish_pending_reply(chat_id, f"Error: {str(e)}")
 
     @app.get("/htmx/chat/{chat_id}/messages", response_class=HTMLResponse)
     async def htmx_chat_messages(request: Request, chat_id: int):
+        headers = _cache_headers()
+        if not_modified := _not_modified(request, headers):
+            return not_modified
         messages = await db.get_chat_messages(chat_id)
-        return templates.TemplateResponse("partials/chat_messages.html", {
-            "request": request, "messages": messages, "chat_id": chat_id,
-        })
+        return render("partials/chat_messages.html", request, headers=headers,
+                      messages=messages, chat_id=chat_id)
 
     @app.post("/htmx/chat/new", response_class=HTMLResponse)
     async def htmx_chat_new(request: Request):
         chat_id = await db.create_chat()
-        response = HTMLResponse("")
-        response.headers["HX-Redirect"] = f"/chat/{chat_id}"
-        return response
+        return Response(status_code=204, headers={"HX-Redirect": f"/chat/{chat_id}"})
 
     @app.delete("/htmx/chat/{chat_id}", response_class=HTMLResponse)
     async def htmx_chat_delete(request: Request, chat_id: int):
         await db.delete_chat(chat_id)
-        response = HTMLResponse("")
-        response.headers["HX-Redirect"] = "/chat"
-        return response
+        return Response(status_code=204, headers={"HX-Redirect": "/chat"})
 
     # --- Chat API ---
 
     @app.post("/api/chat")
     async def api_create_chat(request: Request):
-        body = await request.json() if request.headers.get("content-type") == "application/json" else {}
-        title = body.get("title", "New Chat") if body else "New Chat"
+        # Body is optional; an empty or non-JSON body just gets the default title
+        try:
+            body = await _json_body(request)
+        except _InvalidJSON:
+            body = {}
+        title = body.get("title", "New Chat") if isinstance(body, dict) else "New Chat"
         chat_id = await db.create_chat(title=title)
         return {"chat_id": chat_id}
 
     @app.post("/api/chat/{chat_id}/message")
     async def api_send_message(chat_id: int, request: Request):
-        body = await request.json()
+        body = await _json_body(request)
         message = body.get("message", "")
         if not message:
-            return JSONResponse({"error": "message is required"}, status_code=400)
+            return ORJSONResponse({"error": "message is required"}, status_code=400)
         if not orchestrator:
-            return JSONResponse({"error": "No orchestrator"}, status_code=500)
+            return ORJSONResponse({"error": "No orchestrator"}, status_code=500)
         response = await orchestrator.chat(chat_id, message)
         return {"response": response}
 
@@ -353,7 +777,7 @@ def create_app(db: Database, orchestrator=None, scheduler=None, api_key: str | N
         onboarding_done = await db.get_setting("onboarding_complete")
         if onboarding_done:
             return RedirectResponse("/chat", status_code=302)
-        return templates.TemplateResponse("onboarding.html", {"request": request})
+        return render("onboarding.html", request)
 
     @app.post("/htmx/onboarding/check-claude", response_class=HTMLResponse)
     async def htmx_onboarding_check_claude(request: Request):
@@ -369,9 +793,7 @@ def create_app(db: Database, orchestrator=None, scheduler=None, api_key: str | N
         except Exception:
             version = ""
             success = False
-        return templates.TemplateResponse("partials/onboarding_claude_check.html", {
-            "request": request, "success": success, "version": version,
-        })
+        return render("partials/onboarding_claude_check.html", request, success=success, version=version)
 
     @app.post("/htmx/onboarding/save-telegram", response_class=HTMLResponse)
     async def htmx_onboarding_save_telegram(request: Request,
@@ -381,16 +803,13 @@ def create_app(db: Database, orchestrator=None, scheduler=None, api_key: str | N
             await db.set_setting("telegram_token", telegram_token.strip())
         if telegram_users.strip():
             await db.set_setting("telegram_allowed_users", telegram_users.strip())
-        return templates.TemplateResponse("partials/onboarding_telegram_saved.html", {
-            "request": request, "saved": bool(telegram_token.strip()),
-        })
+        return render("partials/onboarding_telegram_saved.html", request,
+                      saved=bool(telegram_token.strip()))
 
     @app.post("/htmx/onboarding/complete", response_class=HTMLResponse)
     async def htmx_onboarding_complete(request: Request):
         await db.set_setting("onboarding_complete", "true")
-        response = HTMLResponse("")
-        response.headers["HX-Redirect"] = "/chat"
-        return response
+        return Response(status_code=204, headers={"HX-Redirect": "/chat"})
 
     # --- Settings HTMX ---
 
@@ -402,13 +821,13 @@ def create_app(db: Database, orchestrator=None, scheduler=None, api_key: str | N
                 value = form.get(field["key"], "")
                 if value:
                     await db.set_setting(field["key"], str(value))
-        return templates.TemplateResponse("partials/settings_saved.html", {"request": request})
+        return render("partials/settings_saved.html", request)
 
     # --- API Endpoints ---
 
     @app.post("/api/tasks")
     async def api_create_task(request: Request):
-        body = await request.json()
+        body = await _json_body(request)
         agent_type = body.get("agent_type", "general")
         prompt = body.get("prompt", "")
         priority = body.get("priority", 0)
@@ -421,16 +840,30 @@ def create_app(db: Database, orchestrator=None, scheduler=None, api_key: str | N
         return {"task_id": task_id}
 
     @app.get("/api/tasks")
-    async def api_list_tasks(status: str = None, agent_type: str = None, limit: int = 50):
-        return await db.list_tasks(status=status, agent_type=agent_type, limit=limit)
+    async def api_list_tasks(request: Request, status: str = None, agent_type: str = None, limit: int = 50):
+        headers = _cache_headers()
+        if not_modified := _not_modified(request, headers):
+            return not_modified
+        tasks = await db.list_tasks(status=status, agent_type=agent_type, limit=limit)
+        return ORJSONResponse(tasks, headers=headers)
 
     @app.get("/api/tasks/{task_id}")
     async def api_get_task(task_id: int):
         task = await db.get_task(task_id)
         if not task:
-            return JSONResponse({"error": "Not found"}, status_code=404)
-        conversation = await db.get_conversation(task_id)
-        return {"task": task, "conversation": conversation}
+            return ORJSONResponse({"error": "Not found"}, status_code=404)
+
+        # Conversations can be long; stream them row by row rather than
+        # building the whole list and its JSON in memory
+        async def body():
+            yield b'{"task":' + orjson.dumps(task) + b',"conversation":['
+            sep = b""
+            async for row in db.iter_conversation(task_id):
+                yield sep + orjson.dumps(row)
+                sep = b","
+            yield b"]}"
+
+        return StreamingResponse(body(), media_type="application/json")
 
     # --- HTMX Partials ---
 
@@ -441,23 +874,31 @@ def create_app(db: Database, orchestrator=None, scheduler=None, api_key: str | N
             asyncio.create_task(orchestrator.execute_task(task_id))
         else:
             task_id = await db.create_task(agent_type=agent_type, prompt=prompt, source="dashboard")
-        tasks = await db.list_tasks(limit=20)
-        return templates.TemplateResponse("partials/task_list.html", {
-            "request": request, "tasks": tasks,
-        })
+        tasks = await db.list_tasks(limit=20, columns=TASK_SUMMARY_COLUMNS)
+        return render("partials/task_list.html", request, tasks=tasks)
 
     @app.get("/htmx/tasks/refresh", response_class=HTMLResponse)
-    async def htmx_refresh_tasks(request: Request, status: str = None, agent_type: str = None):
-        tasks = await db.list_tasks(status=status, agent_type=agent_type, limit=100)
-        return templates.TemplateResponse("partials/task_list.html", {
-            "request": request, "tasks": tasks,
-        })
+    async def htmx_refresh_tasks(request: Request, status: str = None, agent_type: str = None,
+                                 offset: int = Query(0, ge=0),
+                                 limit: int = Query(_TASK_PAGE_SIZE, ge=1, le=_TASK_PAGE_SIZE),
+                                 paginate: bool = False):
+        # Only the /tasks list opts in to infinite scroll; the dashboard poll
+        # reuses this partial and must never grow a "Loading more..." trigger
+        headers = _cache_headers()
+        if not_modified := _not_modified(request, headers):
+            return not_modified
+        tasks = await db.list_tasks(status=status, agent_type=agent_type, limit=limit,
+                                    offset=offset, columns=TASK_SUMMARY_COLUMNS)
+        next_offset = offset + limit if paginate and len(tasks) == limit else None
+        return render("partials/task_list.html", request, headers=headers, tasks=tasks,
+                      offset=offset, next_offset=next_offset,
+                      filter_status=status, filter_agent=agent_type)
 
     # --- Cron Job API ---
 
     @app.post("/api/cron")
     async def api_create_cron(request: Request):
-        body = await request.json()
+        body = await _json_body(request)
         job_id = await db.create_cron_job(
             name=body["name"], schedule=body["schedule"],
             agent_type=body["agent_type"], prompt=body["prompt"],
@@ -470,7 +911,7 @@ def create_app(db: Database, orchestrator=None, scheduler=None, api_key: str | N
     async def api_toggle_cron(job_id: int):
         job = await db.get_cron_job(job_id)
         if not job:
-            return JSONResponse({"error": "Not found"}, status_code=404)
+            return ORJSONResponse({"error": "Not found"}, status_code=404)
         new_state = not job["enabled"]
         await db.update_cron_job(job_id, enabled=new_state)
         if scheduler:
@@ -488,37 +929,45 @@ def create_app(db: Database, orchestrator=None, scheduler=None, api_key: str | N
 
     @app.post("/api/agents")
     async def api_create_agent(request: Request):
-        body = await request.json()
+        body = await _json_body(request)
         agent_id = await db.create_agent(
             name=body["name"], system_prompt=body["system_prompt"],
             working_dir=body.get("working_dir"), timeout_seconds=body.get("timeout_seconds", 300),
         )
+        await refresh_agents()
         return {"agent_id": agent_id}
 
     _ALLOWED_AGENT_FIELDS = {"system_prompt", "working_dir", "timeout_seconds", "max_concurrent", "allowed_tools"}
 
     @app.put("/api/agents/{name}")
     async def api_update_agent(name: str, request: Request):
-        body = await request.json()
+        body = await _json_body(request)
         filtered = {k: v for k, v in body.items() if k in _ALLOWED_AGENT_FIELDS}
         if not filtered:
-            return JSONResponse({"error": "No valid fields provided"}, status_code=400)
+            return ORJSONResponse({"error": "No valid fields provided"}, status_code=400)
         await db.update_agent(name, **filtered)
+        await refresh_agents()
         return {"ok": True}
 
     @app.get("/api/agents")
-    async def api_list_agents():
-        return await db.list_agents()
+    async def api_list_agents(request: Request):
+        headers = _cache_headers()
+        if not_modified := _not_modified(request, headers):
+            return not_modified
+        return ORJSONResponse(await cached_list_agents(), headers=headers)
 
     # --- Settings API ---
 
     @app.get("/api/settings")
-    async def api_list_settings():
-        return await db.list_settings()
+    async def api_list_settings(request: Request):
+        headers = _cache_headers()
+        if not_modified := _not_modified(request, headers):
+            return not_modified
+        return ORJSONResponse(await db.list_settings(), headers=headers)
 
     @app.put("/api/settings/{key}")
     async def api_set_setting(key: str, request: Request):
-        body = await request.json()
+        body = await _json_body(request)
         await db.set_setting(key, body["value"])
         return {"ok": True}
 
@@ -526,66 +975,51 @@ def create_app(db: Database, orchestrator=None, scheduler=None, api_key: str | N
 
     _VALID_PROJECT_STATUSES = {"draft", "active", "completed", "archived"}
     _VALID_PT_STATUSES = {"pending", "running", "completed", "failed", "skipped"}
-    _MAX_BRIEF_SIZE = 50_000
-    _MAX_PROMPT_SIZE = 20_000
-
-    def _validate_depends_on(deps) -> list[int] | None:
-        if not isinstance(deps, list):
-            return None
-        if not all(isinstance(d, int) for d in deps):
-            return None
-        return deps
 
     @app.post("/api/projects")
     async def api_create_project(request: Request):
-        body = await request.json()
-        name = body.get("name")
-        if not name or not isinstance(name, str):
-            return JSONResponse({"error": "name is required"}, status_code=400)
-        brief = body.get("brief", "")
-        if len(brief) > _MAX_BRIEF_SIZE:
-            return JSONResponse({"error": f"brief exceeds {_MAX_BRIEF_SIZE} chars"}, status_code=400)
-        project_id = await db.create_project(name=name, brief=brief)
-        for i, t in enumerate(body.get("tasks", [])):
-            raw_deps = t.get("depends_on", [])
-            deps = _validate_depends_on(raw_deps)
-            if deps is None:
-                return JSONResponse({"error": "depends_on must be a list of integers"}, status_code=400)
-            prompt = t.get("prompt", "")
-            if len(prompt) > _MAX_PROMPT_SIZE:
-                return JSONResponse({"error": f"task prompt exceeds {_MAX_PROMPT_SIZE} chars"}, status_code=400)
-            await db.create_project_task(
-                project_id=project_id, title=t.get("title", f"Task {i+1}"),
-                agent_type=t.get("agent_type", "general"),
-                prompt=prompt, position=t.get("position", i),
-                depends_on=json.dumps(deps),
-            )
+        try:
+            payload = ProjectCreate.model_validate(await _json_body(request))
+        except ValidationError as e:
+            return _validation_error(e)
+        project_id = await db.create_project(name=payload.name, brief=payload.brief)
+        if payload.tasks:
+            await db.bulk_create_project_tasks(project_id, [
+                (t.title or f"Task {i+1}", t.agent_type, t.prompt,
+                 i if t.position is None else t.position, _dump_depends_on(t.depends_on))
+                for i, t in enumerate(payload.tasks)
+            ])
         return {"project_id": project_id}
 
     @app.get("/api/projects")
-    async def api_list_projects(status: str = None, limit: int = 50):
-        return await db.list_projects(status=status, limit=limit)
+    async def api_list_projects(request: Request, status: str = None, limit: int = 50):
+        headers = _cache_headers()
+        if not_modified := _not_modified(request, headers):
+            return not_modified
+        return ORJSONResponse(await db.list_projects(status=status, limit=limit), headers=headers)
 
     @app.get("/api/projects/{project_id}")
-    async def api_get_project(project_id: int):
-        project = await db.get_project(project_id)
+    async def api_get_project(request: Request, project_id: int):
+        headers = _cache_headers()
+        if not_modified := _not_modified(request, headers):
+            return not_modified
+        project, tasks = await db.get_project_with_tasks(project_id)
         if not project:
-            return JSONResponse({"error": "Not found"}, status_code=404)
-        tasks = await db.list_project_tasks(project_id)
-        return {"project": project, "tasks": tasks}
+            return ORJSONResponse({"error": "Not found"}, status_code=404)
+        return ORJSONResponse({"project": project, "tasks": tasks}, headers=headers)
 
     _ALLOWED_PROJECT_FIELDS = {"name", "brief", "status"}
 
     @app.put("/api/projects/{project_id}")
     async def api_update_project(project_id: int, request: Request):
-        body = await request.json()
+        body = await _json_body(request)
         filtered = {k: v for k, v in body.items() if k in _ALLOWED_PROJECT_FIELDS}
         if not filtered:
-            return JSONResponse({"error": "No valid fields provided"}, status_code=400)
+            return ORJSONResponse({"error": "No valid fields provided"}, status_code=400)
         if "status" in filtered and filtered["status"] not in _VALID_PROJECT_STATUSES:
-            return JSONResponse({"error": f"Invalid status. Must be one of: {_VALID_PROJECT_STATUSES}"}, status_code=400)
+            return ORJSONResponse({"error": f"Invalid status. Must be one of: {_VALID_PROJECT_STATUSES}"}, status_code=400)
         if "brief" in filtered and len(filtered.get("brief", "")) > _MAX_BRIEF_SIZE:
-            return JSONResponse({"error": f"brief exceeds {_MAX_BRIEF_SIZE} chars"}, status_code=400)
+            return ORJSONResponse({"error": f"brief exceeds {_MAX_BRIEF_SIZE} chars"}, status_code=400)
         await db.update_project(project_id, **filtered)
         return {"ok": True}
 
@@ -597,61 +1031,47 @@ def create_app(db: Database, orchestrator=None, scheduler=None, api_key: str | N
     @app.post("/api/projects/{project_id}/start")
     async def api_start_project(project_id: int):
         if not orchestrator:
-            return JSONResponse({"error": "No orchestrator"}, status_code=500)
+            return ORJSONResponse({"error": "No orchestrator"}, status_code=500)
         project = await db.get_project(project_id)
         if not project:
-            return JSONResponse({"error": "Not found"}, status_code=404)
+            return ORJSONResponse({"error": "Not found"}, status_code=404)
         if project["status"] != "draft":
-            return JSONResponse({"error": f"Cannot start project with status '{project['status']}'"}, status_code=400)
+            return ORJSONResponse({"error": f"Cannot start project with status '{project['status']}'"}, status_code=400)
         await orchestrator.start_project(project_id)
         return {"ok": True}
 
     @app.post("/api/projects/{project_id}/tasks")
     async def api_add_project_task(project_id: int, request: Request):
-        body = await request.json()
-        title = body.get("title")
-        if not title or not isinstance(title, str):
-            return JSONResponse({"error": "title is required"}, status_code=400)
-        raw_deps = body.get("depends_on", [])
-        deps = _validate_depends_on(raw_deps)
-        if deps is None:
-            return JSONResponse({"error": "depends_on must be a list of integers"}, status_code=400)
-        prompt = body.get("prompt", "")
-        if len(prompt) > _MAX_PROMPT_SIZE:
-            return JSONResponse({"error": f"prompt exceeds {_MAX_PROMPT_SIZE} chars"}, status_code=400)
+        try:
+            payload = ProjectTaskCreate.model_validate(await _json_body(request))
+        except ValidationError as e:
+            return _validation_error(e)
+        deps = payload.depends_on
         if deps:
-            existing = await db.list_project_tasks(project_id)
-            existing_ids = {t["id"] for t in existing}
+            existing_ids = await db.existing_project_task_ids(project_id, deps)
             invalid_deps = [d for d in deps if d not in existing_ids]
             if invalid_deps:
-                return JSONResponse({"error": f"depends_on references non-existent tasks: {invalid_deps}"}, status_code=400)
+                return ORJSONResponse({"error": f"depends_on references non-existent tasks: {invalid_deps}"}, status_code=400)
         pt_id = await db.create_project_task(
-            project_id=project_id, title=title,
-            agent_type=body.get("agent_type", "general"),
-            prompt=prompt, position=body.get("position", 0),
-            depends_on=json.dumps(deps),
+            project_id=project_id, title=payload.title,
+            agent_type=payload.agent_type, prompt=payload.prompt,
+            position=payload.position, depends_on=_dump_depends_on(deps),
         )
         return {"project_task_id": pt_id}
 
-    _ALLOWED_PT_FIELDS = {"title", "agent_type", "prompt", "position", "depends_on", "status"}
-
     @app.put("/api/project-tasks/{pt_id}")
     async def api_update_project_task(pt_id: int, request: Request):
-        body = {k: v for k, v in (await request.json()).items() if k in _ALLOWED_PT_FIELDS}
+        try:
+            payload = ProjectTaskUpdate.model_validate(await _json_body(request))
+        except ValidationError as e:
+            return _validation_error(e)
+        body = payload.model_dump(exclude_none=True)
         if not body:
-            return JSONResponse({"error": "No valid fields provided"}, status_code=400)
+            return ORJSONResponse({"error": "No valid fields provided"}, status_code=400)
         if "status" in body and body["status"] not in _VALID_PT_STATUSES:
-            return JSONResponse({"error": f"Invalid status. Must be one of: {_VALID_PT_STATUSES}"}, status_code=400)
-        if "prompt" in body and len(body.get("prompt", "")) > _MAX_PROMPT_SIZE:
-            return JSONResponse({"error": f"prompt exceeds {_MAX_PROMPT_SIZE} chars"}, status_code=400)
+            return ORJSONResponse({"error": f"Invalid status. Must be one of: {_VALID_PT_STATUSES}"}, status_code=400)
         if "depends_on" in body:
-            if isinstance(body["depends_on"], list):
-                deps = _validate_depends_on(body["depends_on"])
-                if deps is None:
-                    return JSONResponse({"error": "depends_on must be a list of integers"}, status_code=400)
-                body["depends_on"] = json.dumps(deps)
-            else:
-                return JSONResponse({"error": "depends_on must be a list"}, status_code=400)
+            body["depends_on"] = _dump_depends_on(body["depends_on"])
         await db.update_project_task(pt_id, **body)
         return {"ok": True}
 
@@ -664,11 +1084,12 @@ def create_app(db: Database, orchestrator=None, scheduler=None, api_key: str | N
 
     @app.get("/htmx/projects/{project_id}/tasks", response_class=HTMLResponse)
     async def htmx_project_tasks(request: Request, project_id: int):
-        project = await db.get_project(project_id)
-        project_tasks = await db.list_project_tasks(project_id) if project else []
-        return templates.TemplateResponse("partials/project_task_list.html", {
-            "request": request, "project": project, "project_tasks": project_tasks,
-        })
+        headers = _cache_headers()
+        if not_modified := _not_modified(request, headers):
+            return not_modified
+        project, project_tasks = await db.get_project_with_tasks(project_id)
+        return render("partials/project_task_list.html", request, headers=headers,
+                      project=project, project_tasks=project_tasks)
 
     # --- Health Check ---
 
@@ -683,14 +1104,14 @@ def create_app(db: Database, orchestrator=None, scheduler=None, api_key: str | N
     @app.post("/api/estop")
     async def api_estop():
         if not orchestrator:
-            return JSONResponse({"error": "No orchestrator"}, status_code=500)
+            return ORJSONResponse({"error": "No orchestrator"}, status_code=500)
         result = await orchestrator.estop()
         return {"status": "stopped", **result}
 
     @app.post("/api/resume")
     async def api_resume():
         if not orchestrator:
-            return JSONResponse({"error": "No orchestrator"}, status_code=500)
+            return ORJSONResponse({"error": "No orchestrator"}, status_code=500)
         orchestrator.resume()
         return {"status": "resumed"}
 
@@ -704,12 +1125,11 @@ def create_app(db: Database, orchestrator=None, scheduler=None, api_key: str | N
 
     @app.post("/api/webhooks")
     async def api_create_webhook(request: Request):
-        body = await request.json()
+        body = await _json_body(request)
         name = body.get("name")
         if not name or not isinstance(name, str):
-            return JSONResponse({"error": "name is required"}, status_code=400)
+            return ORJSONResponse({"error": "name is required"}, status_code=400)
         agent_type = body.get("agent_type", "general")
-        import secrets
         secret = body.get("secret") or secrets.token_urlsafe(32)
         webhook_id = await db.create_webhook(name=name, agent_type=agent_type, secret=secret)
         return {"webhook_id": webhook_id, "secret": secret}
@@ -727,9 +1147,9 @@ def create_app(db: Database, orchestrator=None, scheduler=None, api_key: str | N
     async def api_trigger_webhook(name: str, request: Request):
         webhook = await db.get_webhook(name)
         if not webhook:
-            return JSONResponse({"error": "Webhook not found"}, status_code=404)
+            return ORJSONResponse({"error": "Webhook not found"}, status_code=404)
         if not webhook["enabled"]:
-            return JSONResponse({"error": "Webhook disabled"}, status_code=403)
+            return ORJSONResponse({"error": "Webhook disabled"}, status_code=403)
 
         # Validate secret via header or query param
         provided_secret = (
@@ -737,15 +1157,15 @@ def create_app(db: Database, orchestrator=None, scheduler=None, api_key: str | N
             or request.query_params.get("secret")
         )
         if provided_secret != webhook["secret"]:
-            return JSONResponse({"error": "Invalid secret"}, status_code=401)
+            return ORJSONResponse({"error": "Invalid secret"}, status_code=401)
 
         # Parse payload
         try:
-            body = await request.json()
-        except Exception:
+            body = await _json_body(request)
+        except _InvalidJSON:
             body = {}
 
-        prompt = body.get("prompt") or body.get("message") or json.dumps(body)
+        prompt = body.get("prompt") or body.get("message") or orjson.dumps(body).decode()
         if not orchestrator:
             task_id = await db.create_task(
                 agent_type=webhook["agent_type"], prompt=prompt, source=f"webhook:{name}",
@@ -762,11 +1182,11 @@ def create_app(db: Database, orchestrator=None, scheduler=None, api_key: str | N
 
     @app.post("/api/memories")
     async def api_create_memory(request: Request):
-        body = await request.json()
+        body = await _json_body(request)
         key = body.get("key")
         content = body.get("content")
         if not key or not content:
-            return JSONResponse({"error": "key and content are required"}, status_code=400)
+            return ORJSONResponse({"error": "key and content are required"}, status_code=400)
         memory_id = await db.create_memory(
             key=key, content=content,
             category=body.get("category", "general"),
@@ -0,0 +1,73 @@
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport
+from punch.db import Database
+from punch.web.app import create_app
+
+
+try:
+    import uvloop
+except ImportError:  # Windows, or uvicorn installed without [standard]
+    uvloop = None
+
+
+if uvloop is not None:
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_asyncio_loop_factories(config, item):
+        """Run the event loop on uvloop."""
+        return {"uvloop": uvloop.new_event_loop}
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def _session_db():
+    """One in-memory database for the whole run; the schema is built once.
+
+    A plain ":memory:" database is private to its connection, so each
+    pytest-xdist worker process gets its own without any per-worker naming.
+    """
+    database = Database(":memory:")
+    await database.initialize(fast_mode=True)
+    yield database
+    await database.close()
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def db(_session_db):
+    """The shared database, emptied after each test.
+
+    Database.execute commits every write, so a wrapping SAVEPOINT can't be
+    rolled back; truncating is the next cheapest way to isolate tests.
+    Resetting sqlite_sequence keeps ids starting at 1.
+    """
+    yield _session_db
+    tables = await _session_db.fetch_all(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+    )
+    deletes = "".join(f"DELETE FROM {t['name']};" for t in tables)
+    await _session_db._conn.executescript(
+        f"PRAGMA foreign_keys=OFF; BEGIN; {deletes} DELETE FROM sqlite_sequence; COMMIT; PRAGMA foreign_keys=ON;"
+    )
+    # executescript bypasses execute(); bump the write counter by hand so
+    # ETags and cached pages from the last test don't match
+    _session_db.data_version += 1
+
+
+@pytest.fixture(scope="session")
+def _session_app(_session_db):
+    return create_app(db=_session_db, orchestrator=None, scheduler=None)
+
+
+@pytest.fixture(scope="session")
+def _session_transport(_session_app):
+    return ASGITransport(app=_session_app)
+
+
+@pytest.fixture
+def transport(_session_app, _session_transport, db):
+    """ASGI transport onto one app shared by the session (no orchestrator or scheduler).
+
+    Tests needing other create_app arguments build their own app.
+    """
+    # The agent list is cached in-process; the db was just emptied
+    _session_app.state.agents = None
+    return _session_transport
@@ -0,0 +1,164 @@
+"""Small test doubles shared across test modules."""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from itertools import count
+
+import httpx
+from httpx import ASGITransport, AsyncClient
+
+from punch.runner import RunResult
+
+
+def make_test_client(target) -> AsyncClient:
+    """AsyncClient onto an app (or an existing ASGITransport), configured once for tests.
+
+    trust_env=False skips proxy/netrc/SSL env lookups that an in-process
+    transport never uses.
+    """
+    transport = target if isinstance(target, ASGITransport) else ASGITransport(app=target)
+    return AsyncClient(
+        transport=transport, base_url="http://test",
+        timeout=httpx.Timeout(5.0, connect=1.0), trust_env=False,
+    )
+
+
+def fake_run(result: RunResult):
+    """Async stand-in for ClaudeRunner.run that always returns `result`.
+
+    Cheaper than an AsyncMock. Records the number of calls on `.calls` and
+    the keyword arguments of the last one on `.last_kwargs`.
+    """
+    async def run(**kwargs) -> RunResult:
+        run.calls += 1
+        run.last_kwargs = kwargs
+        return result
+
+    run.calls = 0
+    run.last_kwargs = None
+    return run
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class InMemoryDB:
+    """Dict-backed stand-in for the slice of Database the Orchestrator uses.
+
+    For orchestrator and chat logic tests that only need read/write
+    semantics, not SQL. Rows mirror the real tables' columns and defaults.
+    Anything touching projects, cron or the web app still wants the real
+    `db` fixture.
+    """
+
+    def __init__(self):
+        self._ids = count(1)
+        self.tasks: dict[int, dict] = {}
+        self.agents: dict[str, dict] = {}
+        self.conversations: list[dict] = []
+        self.chats: dict[int, dict] = {}
+        self.chat_messages: list[dict] = []
+        self.memories: list[dict] = []
+
+    def _row(self, **fields) -> dict:
+        return {"id": next(self._ids), "created_at": _now(), **fields}
+
+    # --- Tasks ---
+
+    async def create_task(self, agent_type: str, prompt: str, priority: int = 0,
+                          working_dir: str | None = None, source: str = "manual") -> int:
+        row = self._row(
+            agent_type=agent_type, prompt=prompt, status="pending", priority=priority,
+            result=None, error=None, session_id=None, working_dir=working_dir,
+            source=source, started_at=None, completed_at=None,
+        )
+        self.tasks[row["id"]] = row
+        return row["id"]
+
+    async def get_task(self, task_id: int) -> dict | None:
+        task = self.tasks.get(task_id)
+        return dict(task) if task else None
+
+    async def update_task(self, task_id: int, **kwargs) -> None:
+        if "status" in kwargs:
+            if kwargs["status"] == "running":
+                kwargs.setdefault("started_at", _now())
+            elif kwargs["status"] in ("completed", "failed"):
+                kwargs.setdefault("completed_at", _now())
+        if task_id in self.tasks:
+            self.tasks[task_id].update(kwargs)
+
+    async def get_pending_tasks(self) -> list[dict]:
+        pending = [dict(t) for t in self.tasks.values() if t["status"] == "pending"]
+        return sorted(pending, key=lambda t: (-t["priority"], t["id"]))
+
+    # --- Agents ---
+
+    async def create_agent(self, name: str, system_prompt: str,
+                           working_dir: str | None = None, timeout_seconds: int = 300) -> int:
+        row = self._row(
+            name=name, system_prompt=system_prompt, working_dir=working_dir,
+            timeout_seconds=timeout_seconds, max_concurrent=1, allowed_tools=None,
+            require_approval=0,
+        )
+        self.agents[name] = row
+        return row["id"]
+
+    async def get_agent(self, name: str) -> dict | None:
+        agent = self.agents.get(name)
+        return dict(agent) if agent else None
+
+    # --- Conversations ---
+
+    async def add_conversation(self, task_id: int, role: str, content: str) -> int:
+        row = self._row(task_id=task_id, role=role, content=content)
+        self.conversations.append(row)
+        return row["id"]
+
+    async def get_conversation(self, task_id: int) -> list[dict]:
+        return [dict(c) for c in self.conversations if c["task_id"] == task_id]
+
+    # --- Chats ---
+
+    async def create_chat(self, title: str = "New Chat") -> int:
+        row = self._row(title=title, session_id=None, is_active=1, updated_at=_now())
+        self.chats[row["id"]] = row
+        return row["id"]
+
+    async def get_chat(self, chat_id: int) -> dict | None:
+        chat = self.chats.get(chat_id)
+        return dict(chat) if chat else None
+
+    async def get_chat_fields(self, chat_id: int, *fields: str) -> dict | None:
+        chat = self.chats.get(chat_id)
+        return {f: chat[f] for f in fields} if chat else None
+
+    async def update_chat(self, chat_id: int, **kwargs) -> None:
+        kwargs["updated_at"] = _now()
+        if chat_id in self.chats:
+            self.chats[chat_id].update(kwargs)
+
+    async def add_chat_message(self, chat_id: int, role: str, content: str,
+                               task_id: int | None = None, status: str = "complete") -> int:
+        row = self._row(chat_id=chat_id, role=role, content=content, task_id=task_id, status=status)
+        self.chat_messages.append(row)
+        return row["id"]
+
+    async def get_chat_messages(self, chat_id: int) -> list[dict]:
+        return [dict(m) for m in self.chat_messages if m["chat_id"] == chat_id]
+
+    async def update_chat_message(self, message_id: int, **kwargs) -> None:
+        for message in self.chat_messages:
+            if message["id"] == message_id:
+                message.update(kwargs)
+
+    # --- Memories ---
+
+    async def search_memories(self, query: str, category: str | None = None, limit: int = 5) -> list[dict]:
+        found = [
+            dict(m) for m in reversed(self.memories)
+            if (query in m["key"] or query in m["content"])
+            and (category is None or m["category"] == category)
+        ]
+        return found[:limit]
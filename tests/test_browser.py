@@ -1,4 +1,3 @@
-import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 from punch.browser import BrowserManager
 
@@ -9,7 +8,6 @@ def test_browser_manager_init():
     assert bm._browser is None
 
 
-@pytest.mark.asyncio
 async def test_browser_manager_not_started():
     bm = BrowserManager(screenshots_dir="/tmp/screenshots")
     assert not bm.is_running
@@ -1,56 +1,78 @@
 """Tests for chat UI, onboarding, and structured settings features."""
 from __future__ import annotations
 
+import re
+
 import pytest
 import pytest_asyncio
 from unittest.mock import AsyncMock, MagicMock
-from httpx import AsyncClient, ASGITransport
+from httpx import ASGITransport
 
-from punch.db import Database
 from punch.runner import ClaudeRunner, RunResult
 from punch.orchestrator import Orchestrator
 from punch.web.app import create_app, SETTINGS_SCHEMA
+from tests.helpers import InMemoryDB, fake_run, make_test_client
+
+_SECTION_NAMES = re.compile(r"\b(Claude|Telegram|Web|System)\b")
 
 
 # --- Fixtures ---
 
 @pytest_asyncio.fixture
-async def db(tmp_path):
-    database = Database(str(tmp_path / "test.db"))
-    await database.initialize()
-    yield database
-    await database.close()
+async def orchestrator():
+    runner = ClaudeRunner(claude_command="echo", max_concurrent=2)
+    orch = Orchestrator(db=InMemoryDB(), runner=runner)
+    return orch
 
 
 @pytest_asyncio.fixture
-async def orchestrator(db):
+async def client(db, transport):
+    # Set onboarding_complete so middleware doesn't redirect
+    await db.set_setting("onboarding_complete", "true")
+    async with make_test_client(transport) as c:
+        yield c
+
+
+@pytest.fixture(scope="module")
+def orchestrated_app(_session_db):
+    """One app with a real Orchestrator for the tests that need it; each swaps in its own runner.run."""
     runner = ClaudeRunner(claude_command="echo", max_concurrent=2)
-    orch = Orchestrator(db=db, runner=runner)
-    return orch
+    orch = Orchestrator(db=_session_db, runner=runner)
+    return create_app(db=_session_db, orchestrator=orch, scheduler=None)
+
+
+@pytest.fixture(scope="module")
+def _orchestrated_transport(orchestrated_app):
+    return ASGITransport(app=orchestrated_app)
 
 
 @pytest_asyncio.fixture
-async def client(db):
-    # Set onboarding_complete so middleware doesn't redirect
+async def orch_client(db, orchestrated_app, _orchestrated_transport):
     await db.set_setting("onboarding_complete", "true")
-    app = create_app(db=db, orchestrator=None, scheduler=None)
-    transport = ASGITransport(app=app)
-    async with AsyncClient(transport=transport, base_url="http://test") as c:
+    orchestrated_app.state.agents = None
+    async with make_test_client(_orchestrated_transport) as c:
         yield c
 
 
 @pytest_asyncio.fixture
-async def client_no_onboarding(db):
+async def client_no_onboarding(transport):
     """Client without onboarding_complete set."""
-    app = create_app(db=db, orchestrator=None, scheduler=None)
-    transport = ASGITransport(app=app)
-    async with AsyncClient(transport=transport, base_url="http://test") as c:
+    async with make_test_client(transport) as c:
         yield c
 
 
+@pytest.fixture
+def telegram_update():
+    """A fresh Telegram Update mock per test, so no attribute set by one test leaks into another."""
+    update = MagicMock()
+    update.effective_user.id = 12345
+    update.message.chat.send_action = AsyncMock()
+    update.message.reply_text = AsyncMock()
+    return update
+
+
 # --- DB Tests ---
 
-@pytest.mark.asyncio
 async def test_create_chat(db):
     chat_id = await db.create_chat(title="Test Chat")
     chat = await db.get_chat(chat_id)
@@ -60,12 +82,11 @@ async def test_create_chat(db):
     assert chat["session_id"] is None
 
 
-@pytest.mark.asyncio
 async def test_chat_messages_ordered(db):
     chat_id = await db.create_chat()
-    await db.add_chat_message(chat_id, role="user", content="Hello")
-    await db.add_chat_message(chat_id, role="assistant", content="Hi there")
-    await db.add_chat_message(chat_id, role="user", content="How are you?")
+    await db.add_chat_messages_bulk(
+        chat_id, [("user", "Hello"), ("assistant", "Hi there"), ("user", "How are you?")]
+    )
 
     messages = await db.get_chat_messages(chat_id)
     assert len(messages) == 3
@@ -75,7 +96,14 @@ async def test_chat_messages_ordered(db):
     assert messages[2]["content"] == "How are you?"
 
 
-@pytest.mark.asyncio
+async def test_get_chat_fields(db):
+    chat_id = await db.create_chat(title="Fields")
+    assert await db.get_chat_fields(chat_id, "title", "session_id") == {"title": "Fields", "session_id": None}
+    assert await db.get_chat_fields(chat_id + 1, "title") is None
+    with pytest.raises(ValueError):
+        await db.get_chat_fields(chat_id, "title; DROP TABLE chats")
+
+
 async def test_chat_message_pending_to_complete(db):
     chat_id = await db.create_chat()
     msg_id = await db.add_chat_message(chat_id, role="assistant", content="", status="pending")
@@ -90,7 +118,6 @@ async def test_chat_message_pending_to_complete(db):
     assert msg["content"] == "Done!"
 
 
-@pytest.mark.asyncio
 async def test_soft_delete_chat(db):
     chat_id = await db.create_chat()
     await db.delete_chat(chat_id)
@@ -100,7 +127,6 @@ async def test_soft_delete_chat(db):
     assert chat["is_active"] == 0
 
 
-@pytest.mark.asyncio
 async def test_list_chats_excludes_inactive(db):
     id1 = await db.create_chat(title="Active")
     id2 = await db.create_chat(title="Will Delete")
@@ -113,9 +139,8 @@ async def test_list_chats_excludes_inactive(db):
 
 # --- Orchestrator Tests ---
 
-@pytest.mark.asyncio
 async def test_chat_returns_response(orchestrator):
-    orchestrator.runner.run = AsyncMock(return_value=RunResult(
+    orchestrator.runner.run = fake_run(RunResult(
         stdout="Hello! How can I help?", stderr="", exit_code=0, session_id="sess_abc"
     ))
 
@@ -124,32 +149,30 @@ async def test_chat_returns_response(orchestrator):
     assert response == "Hello! How can I help?"
 
 
-@pytest.mark.asyncio
 async def test_chat_session_resumption(orchestrator):
-    orchestrator.runner.run = AsyncMock(return_value=RunResult(
+    orchestrator.runner.run = fake_run(RunResult(
         stdout="Response 1", stderr="", exit_code=0, session_id="sess_123"
     ))
 
     chat_id = await orchestrator.db.create_chat()
     await orchestrator.chat(chat_id, "First message")
 
-    # Verify session_id was saved
-    chat = await orchestrator.db.get_chat(chat_id)
-    assert chat["session_id"] == "sess_123"
-
-    # Second message should use the session_id
-    orchestrator.runner.run = AsyncMock(return_value=RunResult(
+    # Second message should use the session_id saved by the first
+    orchestrator.runner.run = fake_run(RunResult(
         stdout="Response 2", stderr="", exit_code=0, session_id="sess_123"
     ))
     await orchestrator.chat(chat_id, "Second message")
 
-    call_kwargs = orchestrator.runner.run.call_args.kwargs
+    call_kwargs = orchestrator.runner.run.last_kwargs
     assert call_kwargs["session_id"] == "sess_123"
 
+    # Both the session and the title from the first message persisted
+    chat = await orchestrator.db.get_chat_fields(chat_id, "session_id", "title")
+    assert chat == {"session_id": "sess_123", "title": "First message"}
+
 
-@pytest.mark.asyncio
 async def test_chat_auto_titling(orchestrator):
-    orchestrator.runner.run = AsyncMock(return_value=RunResult(
+    orchestrator.runner.run = fake_run(RunResult(
         stdout="Sure!", stderr="", exit_code=0, session_id=None
     ))
 
@@ -158,13 +181,12 @@ async def test_chat_auto_titling(orchestrator):
 
     await orchestrator.chat(chat_id, "Help me write a Python script")
 
-    chat = await orchestrator.db.get_chat(chat_id)
+    chat = await orchestrator.db.get_chat_fields(chat_id, "title")
     assert chat["title"] == "Help me write a Python script"
 
 
-@pytest.mark.asyncio
 async def test_chat_pending_to_complete_flow(orchestrator):
-    orchestrator.runner.run = AsyncMock(return_value=RunResult(
+    orchestrator.runner.run = fake_run(RunResult(
         stdout="Done!", stderr="", exit_code=0, session_id=None
     ))
 
@@ -181,7 +203,6 @@ async def test_chat_pending_to_complete_flow(orchestrator):
 
 # --- Web Tests ---
 
-@pytest.mark.asyncio
 async def test_chat_page_loads(client, db):
     chat_id = await db.create_chat(title="Test Chat")
     resp = await client.get(f"/chat/{chat_id}", follow_redirects=True)
@@ -189,47 +210,91 @@ async def test_chat_page_loads(client, db):
     assert "Test Chat" in resp.text
 
 
-@pytest.mark.asyncio
 async def test_onboarding_redirect_when_no_setting(client_no_onboarding):
     resp = await client_no_onboarding.get("/chat", follow_redirects=False)
     assert resp.status_code == 302
     assert "/onboarding" in resp.headers.get("location", "")
 
 
-@pytest.mark.asyncio
 async def test_settings_page_has_sections(client):
     resp = await client.get("/settings")
     assert resp.status_code == 200
-    assert "Claude" in resp.text
-    assert "Telegram" in resp.text
-    assert "Web" in resp.text
-    assert "System" in resp.text
+    found = set(_SECTION_NAMES.findall(resp.text))
+    assert found >= {"Claude", "Telegram", "Web", "System"}
 
 
-@pytest.mark.asyncio
-async def test_api_send_message(db):
-    await db.set_setting("onboarding_complete", "true")
-    # Create orchestrator with mocked runner
-    runner = ClaudeRunner(claude_command="echo", max_concurrent=2)
-    orch = Orchestrator(db=db, runner=runner)
-    orch.runner.run = AsyncMock(return_value=RunResult(
+async def test_api_send_message(orch_client, orchestrated_app, db):
+    orchestrated_app.state.orchestrator.runner.run = fake_run(RunResult(
         stdout="API response", stderr="", exit_code=0, session_id=None
     ))
 
-    app = create_app(db=db, orchestrator=orch, scheduler=None)
-    transport = ASGITransport(app=app)
-    async with AsyncClient(transport=transport, base_url="http://test") as client:
-        chat_id = await db.create_chat()
-        resp = await client.post(f"/api/chat/{chat_id}/message", json={"message": "Hello"})
-        assert resp.status_code == 200
-        data = resp.json()
-        assert data["response"] == "API response"
+    chat_id = await db.create_chat()
+    resp = await orch_client.post(f"/api/chat/{chat_id}/message", json={"message": "Hello"})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["response"] == "API response"
+
+
+async def test_htmx_chat_new_redirects_with_no_content(client, db):
+    resp = await client.post("/htmx/chat/new")
+    assert resp.status_code == 204
+    assert resp.content == b""
+    assert resp.headers["HX-Redirect"].startswith("/chat/")
+
+
+async def test_api_create_chat_accepts_charset_content_type(client, db):
+    resp = await client.post(
+        "/api/chat", content=b'{"title": "From API"}',
+        headers={"content-type": "application/json; charset=utf-8"},
+    )
+    assert resp.status_code == 200
+    chat = await db.get_chat(resp.json()["chat_id"])
+    assert chat["title"] == "From API"
+
+    resp = await client.post("/api/chat")
+    assert resp.status_code == 200
+    chat = await db.get_chat(resp.json()["chat_id"])
+    assert chat["title"] == "New Chat"
+
+
+async def test_htmx_chat_send_processes_in_background(orch_client, orchestrated_app, db):
+    orchestrated_app.state.orchestrator.runner.run = fake_run(RunResult(
+        stdout="Background reply", stderr="", exit_code=0, session_id=None
+    ))
+
+    chat_id = await db.create_chat()
+    resp = await orch_client.post(f"/htmx/chat/{chat_id}/send", data={"message": "Hello"})
+    assert resp.status_code == 200
+
+    await orchestrated_app.state.chat_queue.join()
+    messages = await db.get_chat_messages(chat_id)
+    assert messages[-1]["role"] == "assistant"
+    assert messages[-1]["status"] == "complete"
+    assert messages[-1]["content"] == "Background reply"
+
+
+async def test_htmx_chat_send_queue_full_fails_placeholder(db):
+    await db.set_setting("onboarding_complete", "true")
+    orch = Orchestrator(db=db, runner=ClaudeRunner(claude_command="echo", max_concurrent=1))
+    app = create_app(db=db, orchestrator=orch, max_workers=1)
+    queue = app.state.chat_queue
+    while not queue.full():
+        queue.put_nowait((AsyncMock(), ()))
+
+    chat_id = await db.create_chat()
+    async with make_test_client(app) as c:
+        resp = await c.post(f"/htmx/chat/{chat_id}/send", data={"message": "Hello"})
+    assert resp.status_code == 503
+
+    messages = await db.get_chat_messages(chat_id)
+    assert [m["role"] for m in messages] == ["user", "assistant"]
+    assert messages[-1]["status"] == "failed"
+    await queue.join()
 
 
 # --- Telegram Tests ---
 
-@pytest.mark.asyncio
-async def test_telegram_handle_chat_message(db):
+async def test_telegram_handle_chat_message(db, telegram_update):
     from punch.telegram_bot import PunchTelegramBot
 
     chat_fn = AsyncMock(return_value="Bot response")
@@ -242,11 +307,8 @@ async def test_telegram_handle_chat_message(db):
     )
 
     # Simulate a message
-    update = MagicMock()
-    update.effective_user.id = 12345
+    update = telegram_update
     update.message.text = "Hello bot"
-    update.message.chat.send_action = AsyncMock()
-    update.message.reply_text = AsyncMock()
 
     await bot._handle_chat_message(update, None)
 
@@ -255,8 +317,7 @@ async def test_telegram_handle_chat_message(db):
     update.message.reply_text.assert_called_once_with("Bot response")
 
 
-@pytest.mark.asyncio
-async def test_telegram_newchat_resets(db):
+async def test_telegram_newchat_resets(db, telegram_update):
     from punch.telegram_bot import PunchTelegramBot
 
     bot = PunchTelegramBot(
@@ -268,10 +329,7 @@ async def test_telegram_newchat_resets(db):
     )
     bot._user_chats[12345] = 999  # existing chat
 
-    update = MagicMock()
-    update.effective_user.id = 12345
-    update.message.reply_text = AsyncMock()
-
+    update = telegram_update
     await bot._handle_newchat(update, None)
 
     # Should have created a new chat, replacing old one
@@ -281,14 +339,12 @@ async def test_telegram_newchat_resets(db):
 
 # --- Dashboard / Home redirect ---
 
-@pytest.mark.asyncio
 async def test_dashboard_page_loads(client):
     resp = await client.get("/dashboard")
     assert resp.status_code == 200
     assert "Dashboard" in resp.text
 
 
-@pytest.mark.asyncio
 async def test_root_redirects_to_chat(client):
     resp = await client.get("/", follow_redirects=False)
     assert resp.status_code == 302
@@ -27,9 +27,13 @@ def test_config_telegram_token():
     assert config.telegram_token is None  # Not set by default
 
 
-def test_config_data_dir_created(tmp_path, monkeypatch):
+def test_config_data_dir_created(tmp_path):
     data_dir = tmp_path / "punch_data"
-    monkeypatch.setenv("PUNCH_DATA_DIR", str(data_dir))
-    config = PunchConfig()
+    config = PunchConfig(
+        data_dir=str(data_dir),
+        screenshots_dir=str(data_dir / "screenshots"),
+        workspaces_dir=str(data_dir / "workspaces"),
+    )
     config.ensure_dirs()
     assert data_dir.exists()
+    assert (data_dir / "screenshots").exists()
@@ -1,19 +1,11 @@
 from __future__ import annotations
 
+import asyncio
+
 import pytest
-import pytest_asyncio
 from punch.db import Database
 
 
-@pytest_asyncio.fixture
-async def db(tmp_path):
-    database = Database(str(tmp_path / "test.db"))
-    await database.initialize()
-    yield database
-    await database.close()
-
-
-@pytest.mark.asyncio
 async def test_initialize_creates_tables(db):
     tables = await db.fetch_all("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name")
     table_names = [t["name"] for t in tables]
@@ -27,7 +19,6 @@ async def test_initialize_creates_tables(db):
     assert "webhooks" in table_names
 
 
-@pytest.mark.asyncio
 async def test_create_task(db):
     task_id = await db.create_task(agent_type="general", prompt="Hello world")
     task = await db.get_task(task_id)
@@ -36,7 +27,6 @@ async def test_create_task(db):
     assert task["status"] == "pending"
 
 
-@pytest.mark.asyncio
 async def test_update_task_status(db):
     task_id = await db.create_task(agent_type="general", prompt="Test")
     await db.update_task(task_id, status="running")
@@ -44,20 +34,18 @@ async def test_update_task_status(db):
     assert task["status"] == "running"
 
 
-@pytest.mark.asyncio
 async def test_list_tasks_filtered(db):
     await db.create_task(agent_type="email", prompt="Check email")
     await db.create_task(agent_type="code", prompt="Fix bug")
     await db.create_task(agent_type="email", prompt="Send reply")
 
-    email_tasks = await db.list_tasks(agent_type="email")
+    email_tasks, all_tasks = await asyncio.gather(
+        db.list_tasks(agent_type="email"), db.list_tasks()
+    )
     assert len(email_tasks) == 2
-
-    all_tasks = await db.list_tasks()
     assert len(all_tasks) == 3
 
 
-@pytest.mark.asyncio
 async def test_cron_job_crud(db):
     job_id = await db.create_cron_job(
         name="Email Check", schedule="*/15 * * * *",
@@ -72,7 +60,6 @@ async def test_cron_job_crud(db):
     assert job["enabled"] == 0
 
 
-@pytest.mark.asyncio
 async def test_agent_crud(db):
     agent_id = await db.create_agent(
         name="email", system_prompt="You are an email assistant.",
@@ -83,7 +70,6 @@ async def test_agent_crud(db):
     assert agent["timeout_seconds"] == 300
 
 
-@pytest.mark.asyncio
 async def test_add_conversation_log(db):
     task_id = await db.create_task(agent_type="general", prompt="Test")
     await db.add_conversation(task_id, role="user", content="Hello")
@@ -95,7 +81,6 @@ async def test_add_conversation_log(db):
     assert logs[1]["role"] == "assistant"
 
 
-@pytest.mark.asyncio
 async def test_settings_get_set(db):
     await db.set_setting("theme", "dark")
     value = await db.get_setting("theme")
@@ -106,7 +91,45 @@ async def test_settings_get_set(db):
     assert value == "light"
 
 
-@pytest.mark.asyncio
 async def test_get_setting_default(db):
     value = await db.get_setting("nonexistent", default="fallback")
     assert value == "fallback"
+
+
+async def test_list_tasks_columns(db):
+    await db.create_task(agent_type="general", prompt="Task 1")
+    tasks = await db.list_tasks(columns=("id", "status"))
+    assert set(tasks[0]) == {"id", "status"}
+    with pytest.raises(ValueError):
+        await db.list_tasks(columns=("id; DROP TABLE tasks",))
+
+
+async def test_data_persists_on_disk(tmp_path):
+    # The shared fixture is in-memory; make sure a file-backed db round-trips
+    path = str(tmp_path / "test.db")
+    database = Database(path)
+    await database.initialize()
+    task_id = await database.create_task(agent_type="general", prompt="Persist me")
+    await database.close()
+
+    database = Database(path)
+    await database.initialize()
+    try:
+        task = await database.get_task(task_id)
+        assert task["prompt"] == "Persist me"
+    finally:
+        await database.close()
+
+
+async def test_initialize_fast_mode(tmp_path):
+    database = Database(str(tmp_path / "fast.db"))
+    await database.initialize(fast_mode=True)
+    try:
+        mode = await database.fetch_one("PRAGMA journal_mode")
+        sync = await database.fetch_one("PRAGMA synchronous")
+        assert mode["journal_mode"] == "memory"
+        assert sync["synchronous"] == 0
+        locking = await database.fetch_one("PRAGMA locking_mode")
+        assert locking["locking_mode"] == "exclusive"
+    finally:
+        await database.close()
@@ -1,17 +1,7 @@
-import pytest
 import pytest_asyncio
-from unittest.mock import AsyncMock
-from punch.db import Database
 from punch.runner import ClaudeRunner, RunResult
 from punch.orchestrator import Orchestrator
-
-
-@pytest_asyncio.fixture
-async def db(tmp_path):
-    database = Database(str(tmp_path / "test.db"))
-    await database.initialize()
-    yield database
-    await database.close()
+from tests.helpers import fake_run
 
 
 @pytest_asyncio.fixture
@@ -21,7 +11,6 @@ async def orchestrator(db):
     return orch
 
 
-@pytest.mark.asyncio
 async def test_estop_cancels_pending(orchestrator, db):
     t1 = await orchestrator.submit("general", "Task 1")
     t2 = await orchestrator.submit("general", "Task 2")
@@ -36,9 +25,8 @@ async def test_estop_cancels_pending(orchestrator, db):
     assert "Emergency stop" in task1["error"]
 
 
-@pytest.mark.asyncio
 async def test_estop_prevents_execution(orchestrator, db):
-    orchestrator.runner.run = AsyncMock(return_value=RunResult(
+    orchestrator.runner.run = fake_run(RunResult(
         stdout="Done", stderr="", exit_code=0, session_id=None
     ))
 
@@ -49,10 +37,9 @@ async def test_estop_prevents_execution(orchestrator, db):
     task = await db.get_task(task_id)
     assert task["status"] == "failed"
     assert "stopped" in task["error"]
-    orchestrator.runner.run.assert_not_called()
+    assert orchestrator.runner.run.calls == 0
 
 
-@pytest.mark.asyncio
 async def test_estop_prevents_queue_processing(orchestrator, db):
     await orchestrator.estop()
     await orchestrator.submit("general", "Pending task")
@@ -63,9 +50,8 @@ async def test_estop_prevents_queue_processing(orchestrator, db):
     assert len(tasks) == 1  # still pending, not picked up
 
 
-@pytest.mark.asyncio
 async def test_resume_after_estop(orchestrator, db):
-    orchestrator.runner.run = AsyncMock(return_value=RunResult(
+    orchestrator.runner.run = fake_run(RunResult(
         stdout="Done", stderr="", exit_code=0, session_id=None
     ))
 
@@ -82,9 +68,8 @@ async def test_resume_after_estop(orchestrator, db):
     assert task["status"] == "completed"
 
 
-@pytest.mark.asyncio
 async def test_delegate(orchestrator, db):
-    orchestrator.runner.run = AsyncMock(return_value=RunResult(
+    orchestrator.runner.run = fake_run(RunResult(
         stdout="Research result", stderr="", exit_code=0, session_id=None
     ))
 
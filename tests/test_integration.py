@@ -1,41 +1,36 @@
 """Integration test: verify all components wire together correctly."""
+import asyncio
 import pytest
 import pytest_asyncio
-from httpx import AsyncClient, ASGITransport
 from punch.config import PunchConfig
-from punch.db import Database
 from punch.runner import ClaudeRunner
 from punch.orchestrator import Orchestrator
 from punch.scheduler import PunchScheduler
 from punch.web.app import create_app
+from tests.helpers import make_test_client
 
 
 @pytest_asyncio.fixture
-async def system(tmp_path):
-    """Set up the full system (minus Telegram and real Claude Code)."""
-    db = Database(str(tmp_path / "test.db"))
-    await db.initialize()
+async def system(db):
+    """Set up the full system (minus Telegram and real Claude Code) on the session database.
 
+    The scheduler loads jobs but isn't started, so nothing fires.
+    """
     await db.set_setting("onboarding_complete", "true")
 
     runner = ClaudeRunner(claude_command="echo", max_concurrent=2)
     orchestrator = Orchestrator(db=db, runner=runner)
     scheduler = PunchScheduler(db=db, submit_fn=orchestrator.submit)
     await scheduler.load_jobs()
-    scheduler.start()
 
     app = create_app(db=db, orchestrator=orchestrator, scheduler=scheduler)
-    transport = ASGITransport(app=app)
-    client = AsyncClient(transport=transport, base_url="http://test")
+    client = make_test_client(app)
 
     yield {"db": db, "orchestrator": orchestrator, "scheduler": scheduler, "client": client}
 
     await client.aclose()
-    scheduler.shutdown()
-    await db.close()
 
 
-@pytest.mark.asyncio
 async def test_full_flow(system):
     client = system["client"]
     db = system["db"]
@@ -90,6 +85,7 @@ async def test_full_flow(system):
     assert any(s["key"] == "test_key" for s in resp.json())
 
     # 8. All pages load without error
-    for path in ["/tasks", "/agents", "/cron", "/browser", "/settings", "/logs"]:
-        resp = await client.get(path)
+    paths = ["/tasks", "/agents", "/cron", "/browser", "/settings", "/logs"]
+    resps = await asyncio.gather(*(client.get(path) for path in paths))
+    for path, resp in zip(paths, resps):
         assert resp.status_code == 200, f"Page {path} failed"
@@ -1,19 +1,7 @@
-import pytest
-import pytest_asyncio
 from unittest.mock import AsyncMock, MagicMock, patch
-from punch.db import Database
 from punch.scheduler import PunchScheduler
 
 
-@pytest_asyncio.fixture
-async def db(tmp_path):
-    database = Database(str(tmp_path / "test.db"))
-    await database.initialize()
-    yield database
-    await database.close()
-
-
-@pytest.mark.asyncio
 async def test_scheduler_loads_jobs(db):
     await db.create_cron_job(
         name="Test Job", schedule="*/5 * * * *",
@@ -25,7 +13,6 @@ async def test_scheduler_loads_jobs(db):
     assert len(scheduler.get_jobs()) == 1
 
 
-@pytest.mark.asyncio
 async def test_scheduler_skips_disabled_jobs(db):
     job_id = await db.create_cron_job(
         name="Disabled", schedule="*/5 * * * *",
@@ -39,7 +26,6 @@ async def test_scheduler_skips_disabled_jobs(db):
     assert len(scheduler.get_jobs()) == 0
 
 
-@pytest.mark.asyncio
 async def test_scheduler_trigger_submits_task(db):
     job_id = await db.create_cron_job(
         name="Trigger Test", schedule="*/5 * * * *",
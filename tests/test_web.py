@@ -1,53 +1,27 @@
-import pytest
+import asyncio
 import pytest_asyncio
-from httpx import AsyncClient, ASGITransport
-from punch.db import Database
-from punch.web.app import create_app
+from punch.web.app import _MAX_BODY_SIZE, create_app
+from tests.helpers import make_test_client
 
 
 @pytest_asyncio.fixture
-async def db(tmp_path):
-    database = Database(str(tmp_path / "test.db"))
-    await database.initialize()
-    yield database
-    await database.close()
-
-
-@pytest_asyncio.fixture
-async def client(db):
+async def client(db, transport):
     await db.set_setting("onboarding_complete", "true")
-    app = create_app(db=db, orchestrator=None, scheduler=None)
-    transport = ASGITransport(app=app)
-    async with AsyncClient(transport=transport, base_url="http://test") as c:
+    async with make_test_client(transport) as c:
         yield c
 
 
-@pytest.mark.asyncio
-async def test_home_page(client):
-    resp = await client.get("/", follow_redirects=True)
-    assert resp.status_code == 200
-    assert "Punch" in resp.text
+async def test_smoke_pages(client):
+    home, tasks, agents, cron = await asyncio.gather(
+        client.get("/", follow_redirects=True),
+        client.get("/tasks"),
+        client.get("/agents"),
+        client.get("/cron"),
+    )
+    assert [r.status_code for r in (home, tasks, agents, cron)] == [200] * 4
+    assert "Punch" in home.text
 
 
-@pytest.mark.asyncio
-async def test_tasks_page(client):
-    resp = await client.get("/tasks")
-    assert resp.status_code == 200
-
-
-@pytest.mark.asyncio
-async def test_agents_page(client):
-    resp = await client.get("/agents")
-    assert resp.status_code == 200
-
-
-@pytest.mark.asyncio
-async def test_cron_page(client):
-    resp = await client.get("/cron")
-    assert resp.status_code == 200
-
-
-@pytest.mark.asyncio
 async def test_api_create_task(client, db):
     resp = await client.post("/api/tasks", json={
         "agent_type": "general",
@@ -58,7 +32,6 @@ async def test_api_create_task(client, db):
     assert data["task_id"] > 0
 
 
-@pytest.mark.asyncio
 async def test_api_list_tasks(client, db):
     await db.create_task(agent_type="general", prompt="Task 1")
     await db.create_task(agent_type="email", prompt="Task 2")
@@ -66,3 +39,195 @@ async def test_api_list_tasks(client, db):
     assert resp.status_code == 200
     data = resp.json()
     assert len(data) == 2
+
+
+async def test_api_key_required(db):
+    app = create_app(db=db, orchestrator=None, scheduler=None, api_key="s3cret")
+    async with make_test_client(app) as c:
+        resp = await c.get("/api/tasks")
+        assert resp.status_code == 401
+        resp = await c.get("/api/tasks", headers={"X-API-Key": "wrong"})
+        assert resp.status_code == 401
+        resp = await c.get("/api/tasks", headers={"X-API-Key": "s3cret"})
+        assert resp.status_code == 200
+        resp = await c.get("/api/tasks", params={"api_key": "s3cret"})
+        assert resp.status_code == 200
+        c.cookies.set("punch_api_key", "s3cret")
+        resp = await c.get("/api/tasks")
+        assert resp.status_code == 200
+
+
+async def test_api_list_tasks_not_modified(client, db):
+    await db.create_task(agent_type="general", prompt="Task 1")
+    resp = await client.get("/api/tasks")
+    etag = resp.headers["etag"]
+
+    resp = await client.get("/api/tasks", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+
+    await db.create_task(agent_type="general", prompt="Task 2")
+    resp = await client.get("/api/tasks", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert len(resp.json()) == 2
+
+
+async def test_agent_cache_invalidated_on_update(client, db):
+    await client.post("/api/agents", json={"name": "writer", "system_prompt": "v1"})
+    resp = await client.get("/api/agents")
+    assert resp.json()[0]["system_prompt"] == "v1"
+
+    resp = await client.put("/api/agents/writer", json={"system_prompt": "v2"})
+    assert resp.status_code == 200
+    resp = await client.get("/api/agents")
+    assert resp.json()[0]["system_prompt"] == "v2"
+
+
+async def test_api_rejects_oversized_body(client, db):
+    resp = await client.post(
+        "/api/tasks", content=b"x" * (_MAX_BODY_SIZE + 1),
+        headers={"content-type": "application/json"},
+    )
+    assert resp.status_code == 413
+    assert resp.json() == {"error": "Request body too large"}
+    assert await db.list_tasks() == []
+
+
+async def test_api_rejects_bad_content_length(client, db):
+    resp = await client.post(
+        "/api/tasks", content=b"{}",
+        headers={"content-type": "application/json", "content-length": "abc"},
+    )
+    assert resp.status_code == 400
+    assert resp.json() == {"error": "Invalid Content-Length"}
+
+
+async def test_api_rejects_malformed_json(client, db):
+    resp = await client.post(
+        "/api/tasks", content=b"{not json",
+        headers={"content-type": "application/json"},
+    )
+    assert resp.status_code == 400
+    assert resp.json() == {"error": "Invalid JSON"}
+    assert await db.list_tasks() == []
+
+
+async def test_security_headers(client):
+    resp = await client.get("/tasks")
+    assert resp.headers["x-content-type-options"] == "nosniff"
+    assert resp.headers["x-frame-options"] == "DENY"
+
+
+async def test_page_cache_misses_after_write(client, db):
+    await db.create_task(agent_type="general", prompt="First task")
+    resp = await client.get("/tasks", params={"status": "pending"})
+    assert "First task" in resp.text
+
+    await db.create_task(agent_type="general", prompt="Second task")
+    resp = await client.get("/tasks", params={"status": "pending"})
+    assert "Second task" in resp.text
+
+    resp = await client.get("/tasks", params={"status": "completed"})
+    assert "Second task" not in resp.text
+
+
+async def test_static_cache_control(tmp_path):
+    from starlette.applications import Starlette
+    from starlette.routing import Mount
+    from punch.web.app import CachedStaticFiles
+
+    (tmp_path / "app.3f9a1c2b.css").write_text("body {}")
+    (tmp_path / "shot.png").write_bytes(b"png")
+    app = Starlette(routes=[Mount("/static", CachedStaticFiles(directory=str(tmp_path)))])
+    async with make_test_client(app) as c:
+        resp = await c.get("/static/app.3f9a1c2b.css")
+        assert "immutable" in resp.headers["cache-control"]
+
+        resp = await c.get("/static/shot.png")
+        assert resp.headers["cache-control"] == "public, max-age=300, must-revalidate"
+        resp = await c.get("/static/shot.png", headers={"If-None-Match": resp.headers["etag"]})
+        assert resp.status_code == 304
+
+
+async def test_static_served_from_memory(tmp_path):
+    from starlette.applications import Starlette
+    from starlette.routing import Mount
+    from punch.web.app import CachedStaticFiles
+
+    path = tmp_path / "shot.png"
+    path.write_bytes(b"first")
+    static = CachedStaticFiles(directory=str(tmp_path))
+    app = Starlette(routes=[Mount("/static", static)])
+    async with make_test_client(app) as c:
+        resp = await c.get("/static/shot.png")
+        assert resp.content == b"first"
+        assert resp.headers["content-type"] == "image/png"
+        assert len(static._memory) == 1
+
+        path.write_bytes(b"second!")
+        resp = await c.get("/static/shot.png")
+        assert resp.content == b"second!"
+        assert resp.headers["content-length"] == "7"
+        # The overwritten file replaced its entry rather than adding another
+        assert len(static._memory) == 1
+
+
+async def test_static_skips_api_key(db):
+    await db.set_setting("onboarding_complete", "true")
+    app = create_app(db=db, orchestrator=None, scheduler=None, api_key="secret")
+    async with make_test_client(app) as c:
+        assert (await c.get("/static/.gitkeep")).status_code == 200
+        resp = await c.get("/tasks")
+        assert resp.status_code == 401
+        assert resp.headers["x-frame-options"] == "DENY"
+
+
+async def test_htmx_tasks_refresh_pages(client, db):
+    from punch.web.app import _TASK_PAGE_SIZE
+    for i in range(_TASK_PAGE_SIZE + 3):
+        await db.create_task(agent_type="general", prompt=f"Task {i}")
+
+    resp = await client.get("/htmx/tasks/refresh", params={"paginate": 1})
+    assert resp.text.count('href="/tasks/') == _TASK_PAGE_SIZE
+    assert f"offset={_TASK_PAGE_SIZE}" in resp.text
+    assert "data-paged" not in resp.text
+
+    resp = await client.get("/htmx/tasks/refresh", params={"paginate": 1, "offset": _TASK_PAGE_SIZE})
+    assert resp.text.count('href="/tasks/') == 3
+    assert "offset=" not in resp.text
+    assert "data-paged" in resp.text
+    assert "No tasks yet" not in resp.text
+
+
+async def test_htmx_tasks_refresh_without_paginate_has_no_next_page(client, db):
+    from punch.web.app import _TASK_PAGE_SIZE
+    for i in range(_TASK_PAGE_SIZE + 3):
+        await db.create_task(agent_type="general", prompt=f"Task {i}")
+
+    resp = await client.get("/htmx/tasks/refresh")
+    assert resp.text.count('href="/tasks/') == _TASK_PAGE_SIZE
+    assert "Loading more" not in resp.text
+
+    # The dashboard poll asks for the same 20 rows it first rendered
+    resp = await client.get("/htmx/tasks/refresh", params={"limit": 20})
+    assert resp.text.count('href="/tasks/') == 20
+    assert "Loading more" not in resp.text
+
+
+async def test_tasks_page_poll_keeps_both_filters(client, db):
+    resp = await client.get("/tasks", params={"status": "pending", "agent_type": "code"})
+    assert "paginate=1&amp;status=pending&amp;agent_type=code" in resp.text
+
+
+async def test_api_get_task_streams_conversation(client, db):
+    task_id = await db.create_task(agent_type="general", prompt="Task 1")
+    for i in range(3):
+        await db.add_conversation(task_id, "assistant", f"msg {i}")
+
+    resp = await client.get(f"/api/tasks/{task_id}")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["task"]["id"] == task_id
+    assert [c["content"] for c in data["conversation"]] == ["msg 0", "msg 1", "msg 2"]
+
+    resp = await client.get("/api/tasks/9999")
+    assert resp.status_code == 404